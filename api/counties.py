@@ -1,13 +1,22 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import csv
+import functools
+import hashlib
+import io
 import os
-import re
-
-def load_iowa_counties_and_cities(csv_path="city-county-mapping.csv"):
-    """Parse the Iowa cities CSV and extract counties with their cities."""
-    county_cities = {}
-
+import sys
+from email.utils import formatdate, parsedate_to_datetime
+
+def _collapse_ws(s):
+    """Collapse whitespace runs to single spaces and strip the ends."""
+    # Non-space whitespace is non-printable, so clean strings skip the split/join
+    if s.isprintable() and '  ' not in s and s[:1] != ' ' and s[-1:] != ' ':
+        return s
+    return ' '.join(s.split())
+
+def _resolve_csv_path(csv_path="city-county-mapping.csv"):
+    """Return the first existing candidate location of the CSV, or None."""
     # Try multiple paths for the CSV file
     possible_paths = [
         csv_path,
@@ -17,75 +26,155 @@ def load_iowa_counties_and_cities(csv_path="city-county-mapping.csv"):
         os.path.join(os.path.dirname(__file__), "..", csv_path)
     ]
 
-    csv_file = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            csv_file = path
-            break
+    return next((path for path in possible_paths if os.path.exists(path)), None)
 
+# Probe the candidate locations once per process rather than on every request
+_CSV_PATH = _resolve_csv_path()
+
+def _csv_cache_key(csv_path=None):
+    """Return (path, mtime_ns) for cache keying, or None if the CSV is missing."""
+    csv_file = _CSV_PATH if csv_path is None else _resolve_csv_path(csv_path)
     if not csv_file:
-        return {}, []
+        return None
 
-    try:
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
+    return csv_file, os.stat(csv_file).st_mtime_ns
+
+@functools.lru_cache(maxsize=4)
+def _parse_counties_csv(csv_file, mtime_ns):
+    """Parse the CSV once per (path, mtime); later calls are served from the cache."""
+    county_sets = {}
 
-            for row in csv_reader:
-                city = row.get('City', '').strip()
-                county = row.get('County', '').strip()
+    # Read the whole (small) file in one go; utf-8-sig drops a leading BOM
+    with open(csv_file, 'rb') as file:
+        text = file.read().decode('utf-8-sig')
 
-                if not city or not county:
-                    continue
+    csv_reader = csv.reader(io.StringIO(text))
+    header = next(csv_reader, [])
+    city_index = header.index('City')
+    county_index = header.index('County')
+    row_length = max(city_index, county_index) + 1
 
-                city = re.sub(r'\s+', ' ', city)
-                county = re.sub(r'\s+', ' ', county)
+    for row in csv_reader:
+        if len(row) < row_length:
+            continue
 
-                if county not in county_cities:
-                    county_cities[county] = []
+        city = _collapse_ws(row[city_index])
+        # Every row repeats its county name; intern so each exists once in memory
+        county = sys.intern(_collapse_ws(row[county_index]))
 
-                if city not in county_cities[county]:
-                    county_cities[county].append(city)
+        if not city or not county:
+            continue
 
-        for county in county_cities:
-            county_cities[county].sort()
+        county_sets.setdefault(county, set()).add(city)
 
-        counties = sorted(county_cities.keys())
+    county_cities = {county: sorted(cities) for county, cities in county_sets.items()}
+    counties = sorted(county_sets)
 
-        return county_cities, counties
+    return county_cities, counties
 
+def load_iowa_counties_and_cities(csv_path=None):
+    """Parse the Iowa cities CSV and extract counties with their cities."""
+    try:
+        key = _csv_cache_key(csv_path)
+        if key is None:
+            return {}, []
+        return _parse_counties_csv(*key)
     except Exception as e:
         return {}, []
 
+@functools.lru_cache(maxsize=4)
+def _build_counties_body(csv_file, mtime_ns):
+    """Serialize the counties response once per (path, mtime)."""
+    county_cities_dict, counties_list = _parse_counties_csv(csv_file, mtime_ns)
+    return json.dumps({
+        "counties": [
+            {"name": county, "city_count": len(county_cities_dict[county])}
+            for county in counties_list
+        ]
+    }, separators=(",", ":")).encode()
+
+def _with_validators(body, last_modified_ts):
+    """Bundle a body with its ETag, Last-Modified timestamp and cache headers."""
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    last_modified = formatdate(last_modified_ts, usegmt=True) if last_modified_ts else None
+    cache_headers = (
+        f"ETag: {etag}\r\n"
+        + (f"Last-Modified: {last_modified}\r\n" if last_modified else "")
+        + "Cache-Control: public, max-age=3600\r\n"
+    ).encode('latin-1')
+    return body, etag, last_modified_ts, cache_headers
+
+@functools.lru_cache(maxsize=4)
+def _build_counties_response(csv_file, mtime_ns):
+    """Build the body and its validators once per (path, mtime)."""
+    return _with_validators(_build_counties_body(csv_file, mtime_ns), mtime_ns // 1_000_000_000)
+
+_EMPTY_RESPONSE = _with_validators(json.dumps({"counties": []}).encode(), None)
+
+def get_counties_response():
+    """Return (body, etag, last_modified_ts, cache_headers) for the current CSV.
+
+    Only a stat runs per request; a changed mtime rebuilds the body and validators.
+    """
+    try:
+        key = _csv_cache_key()
+        if key is not None:
+            return _build_counties_response(*key)
+    except Exception as e:
+        pass
+    return _EMPTY_RESPONSE
+
+def get_counties_body():
+    """Return the cached JSON bytes for the counties response."""
+    return get_counties_response()[0]
+
+def _not_modified_since(header, last_modified_ts):
+    """Return True if an If-Modified-Since value is at or after the CSV mtime."""
+    if not header or last_modified_ts is None:
+        return False
+    try:
+        return parsedate_to_datetime(header).timestamp() >= last_modified_ts
+    except (TypeError, ValueError):
+        return False
+
+_JSON_HEADERS = b"Content-Type: application/json\r\nAccess-Control-Allow-Origin: *\r\n"
+_OPTIONS_HEADERS = (
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: GET, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: Content-Type\r\n"
+)
+
 class handler(BaseHTTPRequestHandler):
+    def _write_response(self, status, headers, body=b''):
+        """Write the status line, headers and body with a single write."""
+        self.log_request(status)
+        head = '%s %d %s\r\nServer: %s\r\nDate: %s\r\n' % (
+            self.protocol_version, status, self.responses[status][0],
+            self.version_string(), self.date_time_string())
+        length = b'' if status == 304 else b'Content-Length: %d\r\n' % len(body)
+        self.wfile.write(b''.join((head.encode('latin-1'), headers, length, b'\r\n', body)))
+
     def do_GET(self):
         try:
-            county_cities_dict, counties_list = load_iowa_counties_and_cities()
-            
-            result = {
-                "counties": [
-                    {"name": county, "city_count": len(county_cities_dict[county])}
-                    for county in counties_list
-                ]
-            }
-
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            body, etag, last_modified_ts, cache_headers = get_counties_response()
+
+            # If-None-Match takes precedence over If-Modified-Since when both are sent
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match is not None:
+                not_modified = if_none_match == etag
+            else:
+                not_modified = _not_modified_since(self.headers.get('If-Modified-Since'),
+                                                   last_modified_ts)
+
+            if not_modified:
+                self._write_response(304, cache_headers + b"Access-Control-Allow-Origin: *\r\n")
+                return
+
+            self._write_response(200, _JSON_HEADERS + cache_headers, body)
 
         except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                'error': {'code': '500', 'message': str(e)}
-            }).encode())
+            body = json.dumps({'error': {'code': '500', 'message': str(e)}}).encode()
+            self._write_response(500, _JSON_HEADERS, body)
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        self._write_response(200, _OPTIONS_HEADERS)
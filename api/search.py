@@ -1,18 +1,52 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import requests
-from urllib.parse import quote
+from requests.adapters import HTTPAdapter
 import re
 import csv
+import functools
+import io
 import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List
 
+CITY_SEARCH_WORKERS = 16
+PERMUTATION_WORKERS = 8
+
+_LOWA_RE = re.compile(r'^[Ll]owa\b')
+_CAMEL_RE = re.compile(r'([a-z])([A-Z])')
+
+_SPACE_TO_DASH = str.maketrans({' ': '-'})
+_SLUG_TABLE = str.maketrans({' ': '-', ',': None})
+
+# Shared keep-alive session so repeated probes to CloudFront reuse TLS connections
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0))
+
+# Bounded LRU memo of MP4 probe outcomes: url -> (expires_at, accessible, error)
+MP4_CACHE_TTL = 300
+MP4_CACHE_MAXSIZE = 4096
+_MP4_CACHE = OrderedDict()
+_MP4_CACHE_LOCK = threading.Lock()
+
+def _collapse_ws(s):
+    """Collapse whitespace runs to single spaces and strip the ends."""
+    # Non-space whitespace is non-printable, so clean strings skip the split/join
+    if s.isprintable() and '  ' not in s and s[:1] != ' ' and s[-1:] != ' ':
+        return s
+    return ' '.join(s.split())
+
+@functools.lru_cache(maxsize=2048)
 def generate_mp4_url(first_name: str, last_name: str, hometown: str, state: str):
     """Generate the expected MP4 URL based on the naming pattern."""
-    first_clean = first_name.lower().replace(' ', '-')
-    last_clean = last_name.lower().replace(' ', '-')
-    hometown_clean = hometown.lower().replace(' ', '-').replace(',', '')
+    first_clean = first_name.lower().translate(_SPACE_TO_DASH)
+    last_clean = last_name.lower().translate(_SPACE_TO_DASH)
+    hometown_clean = hometown.lower().translate(_SLUG_TABLE)
     state_clean = state.lower()
 
     filename = f"{first_clean}-{last_clean}-{hometown_clean}-{state_clean}.mp4"
@@ -23,24 +57,62 @@ def generate_mp4_url(first_name: str, last_name: str, hometown: str, state: str)
 def check_mp4_accessibility(mp4_url: str):
     """Check if the MP4 file is accessible."""
     try:
-        response = requests.head(mp4_url, timeout=10, allow_redirects=True)
+        response = SESSION.head(mp4_url, timeout=10, allow_redirects=True)
 
         if response.status_code == 200:
             content_type = response.headers.get('content-type', '').lower()
             if 'video/mp4' in content_type or 'application/octet-stream' in content_type:
                 return True, ""
 
+        # A client error on HEAD (other than HEAD being disallowed) is definitive,
+        # so skip the range request round-trip on the common miss path
+        if 400 <= response.status_code < 500 and response.status_code != 405:
+            return False, ""
+
         # Try GET with range if HEAD fails
         headers = {'Range': 'bytes=0-1'}
-        response = requests.get(mp4_url, headers=headers, timeout=10, stream=True)
-        accessible = response.status_code in [200, 206]
+        with SESSION.get(mp4_url, headers=headers, timeout=10, stream=True) as response:
+            accessible = response.status_code in [200, 206]
+            # Read the small range/error body so the connection goes back to the pool;
+            # a 200 means Range was ignored, so leave that (full) body unread
+            if response.status_code != 200:
+                response.content
         return accessible, ""
 
     except requests.exceptions.RequestException as e:
         return False, str(e)
 
+def check_mp4_accessibility_cached(mp4_url: str):
+    """Check MP4 accessibility, reusing recent outcomes for the same URL."""
+    now = time.monotonic()
+    with _MP4_CACHE_LOCK:
+        cached = _MP4_CACHE.get(mp4_url)
+        if cached is not None:
+            if cached[0] > now:
+                _MP4_CACHE.move_to_end(mp4_url)
+                return cached[1], cached[2]
+            del _MP4_CACHE[mp4_url]
+
+    accessible, error = check_mp4_accessibility(mp4_url)
+    # Transport errors are transient, so only remember definitive answers
+    if not error:
+        with _MP4_CACHE_LOCK:
+            _MP4_CACHE[mp4_url] = (now + MP4_CACHE_TTL, accessible, error)
+            _MP4_CACHE.move_to_end(mp4_url)
+            # Evict least recently used entries so a warm instance stays bounded
+            while len(_MP4_CACHE) > MP4_CACHE_MAXSIZE:
+                _MP4_CACHE.popitem(last=False)
+    return accessible, error
+
 def generate_hometown_permutations(hometown: str):
     """Generate multiple formatting permutations of the hometown."""
+    # Fast path: already canonical single-word names (e.g. cities from the CSV)
+    # are tried as-is; multi-word names still need their no-space variant
+    if (hometown and ' ' not in hometown and hometown.istitle()
+            and hometown == _collapse_ws(hometown)
+            and not hometown.lower().startswith('lowa')):
+        return [hometown]
+
     permutations = []
 
     # Original format
@@ -54,7 +126,7 @@ def generate_hometown_permutations(hometown: str):
 
     # Fix common typo: "lowa" -> "Iowa"
     if hometown and hometown.lower().startswith('lowa'):
-        iowa_fixed = re.sub(r'^[Ll]owa\b', 'Iowa', hometown)
+        iowa_fixed = _LOWA_RE.sub('Iowa', hometown)
         if iowa_fixed != hometown and iowa_fixed not in permutations:
             permutations.append(iowa_fixed)
 
@@ -64,7 +136,7 @@ def generate_hometown_permutations(hometown: str):
         permutations.append(title_case)
 
     # Normalize spaces
-    normalized = ' '.join(hometown.split())
+    normalized = _collapse_ws(hometown)
     if normalized != hometown and normalized not in permutations:
         permutations.append(normalized)
 
@@ -74,7 +146,7 @@ def generate_hometown_permutations(hometown: str):
         permutations.append(no_spaces)
 
     # Insert spaces before capital letters
-    spaced_capitals = re.sub(r'([a-z])([A-Z])', r'\1 \2', hometown)
+    spaced_capitals = _CAMEL_RE.sub(r'\1 \2', hometown)
     if spaced_capitals != hometown and spaced_capitals not in permutations:
         permutations.append(spaced_capitals)
 
@@ -95,29 +167,39 @@ def check_admissions_hit(first_name: str, last_name: str, hometown: str, state:
     """Check if a name and hometown combination results in a hit."""
     debug_info = ""
 
-    hometown_permutations = generate_hometown_permutations(hometown)
+    # Permutations that differ only in case collapse to the same lowercased
+    # MP4 filename, so keep just the first permutation for each distinct URL
+    hometown_permutations = []
+    mp4_urls = []
+    seen_urls = set()
+    for perm in generate_hometown_permutations(hometown):
+        mp4_url, _ = generate_mp4_url(first_name, last_name, perm, state)
+        if mp4_url not in seen_urls:
+            seen_urls.add(mp4_url)
+            hometown_permutations.append(perm)
+            mp4_urls.append(mp4_url)
+
     if debug:
         debug_info += f"Generated {len(hometown_permutations)} hometown permutations to try:\n"
         for i, perm in enumerate(hometown_permutations, 1):
             debug_info += f"  {i}. '{perm}'\n"
         debug_info += "\n"
 
-    for perm_index, hometown_perm in enumerate(hometown_permutations, 1):
-        if debug:
-            debug_info += f"Trying permutation {perm_index}/{len(hometown_permutations)}: '{hometown_perm}'\n"
-
-        encoded_hometown = quote(hometown_perm)
-        home_param = f"{encoded_hometown},{state}"
-        url = f"https://your.admissions.uiowa.edu/?first={first_name.lower()}&last={last_name.lower()}&home={home_param}"
+    # Probe all permutations concurrently; outcomes are consumed in order so
+    # the earliest matching permutation still wins
+    executor = ThreadPoolExecutor(max_workers=max(1, min(PERMUTATION_WORKERS, len(mp4_urls))))
+    try:
+        if len(mp4_urls) > 1:
+            outcomes = executor.map(check_mp4_accessibility_cached, mp4_urls)
+        else:
+            outcomes = map(check_mp4_accessibility_cached, mp4_urls)
 
-        try:
-            expected_mp4_url, expected_filename = generate_mp4_url(first_name, last_name, hometown_perm, state)
+        for perm_index, (hometown_perm, expected_mp4_url, (mp4_accessible, mp4_error)) in enumerate(
+                zip(hometown_permutations, mp4_urls, outcomes), 1):
             if debug:
+                debug_info += f"Trying permutation {perm_index}/{len(hometown_permutations)}: '{hometown_perm}'\n"
                 debug_info += f"Generated MP4 URL: {expected_mp4_url}\n"
 
-            # Always check MP4 accessibility directly - don't rely on cache headers
-            mp4_accessible, mp4_error = check_mp4_accessibility(expected_mp4_url)
-
             if mp4_accessible:
                 if debug:
                     debug_info += f"Hit found with permutation '{hometown_perm}'!\n"
@@ -135,14 +217,13 @@ def check_admissions_hit(first_name: str, last_name: str, hometown: str, state:
                     'timestamp': datetime.now().isoformat(),
                     'debug_info': debug_info if debug else None
                 }
-            else:
-                if debug:
-                    debug_info += f"No hit with permutation '{hometown_perm}', trying next...\n\n"
 
-        except requests.exceptions.RequestException as e:
             if debug:
-                debug_info += f"Request exception with permutation '{hometown_perm}': {str(e)}\n"
-            continue
+                if mp4_error:
+                    debug_info += f"Request exception with permutation '{hometown_perm}': {mp4_error}\n"
+                debug_info += f"No hit with permutation '{hometown_perm}', trying next...\n\n"
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
     if debug:
         debug_info += f"No hit found with any of the {len(hometown_permutations)} permutations tried.\n"
@@ -161,10 +242,8 @@ def check_admissions_hit(first_name: str, last_name: str, hometown: str, state:
         'debug_info': debug_info if debug else None
     }
 
-def load_iowa_counties_and_cities(csv_path="city-county-mapping.csv"):
-    """Parse the Iowa cities CSV and extract counties with their cities."""
-    county_cities = {}
-
+def _resolve_csv_path(csv_path="city-county-mapping.csv"):
+    """Return the first existing candidate location of the CSV, or None."""
     # Try multiple paths for the CSV file
     possible_paths = [
         csv_path,
@@ -174,66 +253,95 @@ def load_iowa_counties_and_cities(csv_path="city-county-mapping.csv"):
         os.path.join(os.path.dirname(__file__), "..", csv_path)
     ]
 
-    csv_file = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            csv_file = path
-            break
+    return next((path for path in possible_paths if os.path.exists(path)), None)
 
+# Probe the candidate locations once per process rather than on every request
+_CSV_PATH = _resolve_csv_path()
+
+def _csv_cache_key(csv_path=None):
+    """Return (path, mtime_ns) for cache keying, or None if the CSV is missing."""
+    csv_file = _CSV_PATH if csv_path is None else _resolve_csv_path(csv_path)
     if not csv_file:
-        return {}, []
+        return None
 
-    try:
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
+    return csv_file, os.stat(csv_file).st_mtime_ns
 
-            for row in csv_reader:
-                city = row.get('City', '').strip()
-                county = row.get('County', '').strip()
+@functools.lru_cache(maxsize=4)
+def _parse_counties_csv(csv_file, mtime_ns):
+    """Parse the CSV once per (path, mtime); later calls are served from the cache."""
+    county_sets = {}
 
-                if not city or not county:
-                    continue
+    # Read the whole (small) file in one go; utf-8-sig drops a leading BOM
+    with open(csv_file, 'rb') as file:
+        text = file.read().decode('utf-8-sig')
 
-                city = re.sub(r'\s+', ' ', city)
-                county = re.sub(r'\s+', ' ', county)
+    csv_reader = csv.reader(io.StringIO(text))
+    header = next(csv_reader, [])
+    city_index = header.index('City')
+    county_index = header.index('County')
+    row_length = max(city_index, county_index) + 1
 
-                if county not in county_cities:
-                    county_cities[county] = []
+    for row in csv_reader:
+        if len(row) < row_length:
+            continue
 
-                if city not in county_cities[county]:
-                    county_cities[county].append(city)
+        city = _collapse_ws(row[city_index])
+        # Every row repeats its county name; intern so each exists once in memory
+        county = sys.intern(_collapse_ws(row[county_index]))
 
-        for county in county_cities:
-            county_cities[county].sort()
+        if not city or not county:
+            continue
 
-        counties = sorted(county_cities.keys())
+        county_sets.setdefault(county, set()).add(city)
 
-        return county_cities, counties
+    county_cities = {county: sorted(cities) for county, cities in county_sets.items()}
+    counties = sorted(county_sets)
 
+    return county_cities, counties
+
+def load_iowa_counties_and_cities(csv_path=None):
+    """Parse the Iowa cities CSV and extract counties with their cities."""
+    try:
+        key = _csv_cache_key(csv_path)
+        if key is None:
+            return {}, []
+        return _parse_counties_csv(*key)
     except Exception as e:
         return {}, []
 
 def search_with_city_iteration(first_name: str, last_name: str, state: str, cities: List[str], debug: bool = False):
-    """Search for a student by iterating through a list of cities."""
+    """Search for a student by probing a list of cities concurrently."""
     debug_info = f"Searching through {len(cities)} cities for {first_name} {last_name}...\n\n"
 
-    for city_index, city in enumerate(cities, 1):
-        if debug:
-            debug_info += f"Trying city {city_index}/{len(cities)}: {city}\n"
-
-        result = check_admissions_hit(first_name, last_name, city, state, debug=False)
+    # Each city probe is network-bound, so fan out and take the first hit
+    executor = ThreadPoolExecutor(max_workers=max(1, min(CITY_SEARCH_WORKERS, len(cities))))
+    try:
+        futures = {
+            executor.submit(check_admissions_hit, first_name, last_name, city, state, False): city
+            for city in cities
+        }
 
-        if result['hit_found']:
+        for cities_tried, future in enumerate(as_completed(futures), 1):
+            city = futures[future]
             if debug:
-                debug_info += f"Found match with city: {city}\n"
-            result['debug_info'] = debug_info if debug else None
-            result['cities_tried'] = city_index
-            result['total_cities'] = len(cities)
-            result['city_found'] = city
-            return result
+                debug_info += f"Checked city {cities_tried}/{len(cities)}: {city}\n"
+
+            result = future.result()
 
-        if debug:
-            debug_info += f"  No match with {city}\n"
+            if result['hit_found']:
+                if debug:
+                    debug_info += f"Found match with city: {city}\n"
+                result['debug_info'] = debug_info if debug else None
+                result['cities_tried'] = cities_tried
+                result['total_cities'] = len(cities)
+                result['city_found'] = city
+                return result
+
+            if debug:
+                debug_info += f"  No match with {city}\n"
+    finally:
+        # Don't wait on in-flight probes once a hit has been found
+        executor.shutdown(wait=False, cancel_futures=True)
 
     if debug:
         debug_info += f"\nNo match found after trying {len(cities)} cities.\n"
@@ -255,7 +363,35 @@ def search_with_city_iteration(first_name: str, last_name: str, state: str, citi
         'debug_info': debug_info if debug else None
     }
 
+def _error_body(code, message):
+    """Encode the JSON error payload shared by all error responses."""
+    return json.dumps({'error': {'code': str(code), 'message': message}}).encode()
+
+# Static validation errors are encoded once rather than per request
+_ERR_MISSING_FIELDS = _error_body(400, 'First name, last name, and state are required')
+_ERR_COUNTY_STATE = _error_body(400, 'County search currently only supports Iowa (IA)')
+_ERR_MISSING_LOCATION = _error_body(400, 'Either hometown or county must be provided')
+
+_JSON_HEADERS = b"Content-Type: application/json\r\nAccess-Control-Allow-Origin: *\r\n"
+_OPTIONS_HEADERS = (
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: POST, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: Content-Type\r\n"
+)
+
 class handler(BaseHTTPRequestHandler):
+    def _write_response(self, status, headers, body=b''):
+        """Write the status line, headers and body with a single write."""
+        self.log_request(status)
+        head = '%s %d %s\r\nServer: %s\r\nDate: %s\r\n' % (
+            self.protocol_version, status, self.responses[status][0],
+            self.version_string(), self.date_time_string())
+        length = b'' if status == 304 else b'Content-Length: %d\r\n' % len(body)
+        self.wfile.write(b''.join((head.encode('latin-1'), headers, length, b'\r\n', body)))
+
+    def _send_json(self, status, body):
+        self._write_response(status, _JSON_HEADERS, body)
+
     def do_POST(self):
         try:
             content_length = int(self.headers.get('Content-Length', 0))
@@ -270,38 +406,20 @@ class handler(BaseHTTPRequestHandler):
             show_debug = data.get('show_debug', False)
 
             if not first_name or not last_name or not state:
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({
-                    'error': {'code': '400', 'message': 'First name, last name, and state are required'}
-                }).encode())
+                self._send_json(400, _ERR_MISSING_FIELDS)
                 return
 
             # County-based search
             if county:
                 if state.upper() != "IA":
-                    self.send_response(400)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({
-                        'error': {'code': '400', 'message': 'County search currently only supports Iowa (IA)'}
-                    }).encode())
+                    self._send_json(400, _ERR_COUNTY_STATE)
                     return
 
                 county_cities_dict, _ = load_iowa_counties_and_cities()
                 cities_in_county = county_cities_dict.get(county, [])
 
                 if not cities_in_county:
-                    self.send_response(404)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({
-                        'error': {'code': '404', 'message': f'No cities found for {county} County'}
-                    }).encode())
+                    self._send_json(404, _error_body(404, f'No cities found for {county} County'))
                     return
 
                 result = search_with_city_iteration(
@@ -323,33 +441,13 @@ class handler(BaseHTTPRequestHandler):
                     debug=show_debug
                 )
             else:
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(json.dumps({
-                    'error': {'code': '400', 'message': 'Either hometown or county must be provided'}
-                }).encode())
+                self._send_json(400, _ERR_MISSING_LOCATION)
                 return
 
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            self._send_json(200, json.dumps(result).encode())
 
         except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                'error': {'code': '500', 'message': str(e)}
-            }).encode())
+            self._send_json(500, _error_body(500, str(e)))
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        self._write_response(200, _OPTIONS_HEADERS)
@@ -1,10 +1,20 @@
 import streamlit as st  # type: ignore
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import quote
 import os
+import hashlib
+import socket
+import threading
+import shutil
+import functools
+import mmap
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 from datetime import datetime
 import re
-import csv
+import asyncio
 
 try:
     import pyperclip  # type: ignore
@@ -12,6 +22,25 @@ try:
 except ImportError:
     CLIPBOARD_AVAILABLE = False
 
+try:
+    import httpx  # type: ignore
+    import h2  # type: ignore  # noqa: F401 (required for httpx http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Maximum concurrent admissions-portal probes during a county search
+CITY_SEARCH_WORKERS = 16
+
+# Hometown permutation patterns, compiled once
+_RE_LOWA = re.compile(r'^[Ll]owa\b')
+_RE_CAMEL = re.compile(r'([a-z])([A-Z])')
+_RE_HAS_CAMEL = re.compile(r'[a-z][A-Z]')
+_RE_WORDS = re.compile(r'[A-Z][a-z]*|[a-z]+')
+
+# MP4 filename cleanup: spaces become dashes, commas are dropped
+_MP4_TRANS = str.maketrans({' ': '-', ',': ''})
+
 # Page configuration
 st.set_page_config(
     page_title="UIowa Admissions Video Finder",
@@ -62,8 +91,64 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_http_session():
+    """
+    Shared requests session so repeated probes to the admissions portal and
+    CloudFront reuse keep-alive connections across searches and reruns.
+    """
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    ))
+    return session
+
+# Hosts contacted during a search; only the CloudFront video host is requested
+PREWARM_HOSTS = ("d3mqiwdgu1iop6.cloudfront.net",)
+
+@st.cache_resource
+def prewarm_dns():
+    """
+    Resolve the known hosts once per process in the background so the OS
+    resolver cache is warm before the first probe.
+    """
+    def resolve():
+        for host in PREWARM_HOSTS:
+            try:
+                socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+            except OSError:
+                pass
+    
+    threading.Thread(target=resolve, daemon=True).start()
+    return True
+
+# Set from the "Show debug information" checkbox at the start of each run
+DEBUG_ENABLED = False
+
+class DebugLog:
+    """
+    Collects debug lines in a list and joins them once when rendered.
+    Appends are no-ops when debugging is disabled, so searches don't build
+    strings nobody will see.
+    """
+    
+    def __init__(self):
+        self.enabled = DEBUG_ENABLED
+        self._parts = []
+    
+    def append(self, text):
+        if self.enabled:
+            self._parts.append(text)
+    
+    def __str__(self):
+        return ''.join(self._parts)
+
 def debug_http_request(method, url, params=None, headers=None):
     """Print HTTP request details for debugging"""
+    if not DEBUG_ENABLED:
+        return ""
     debug_info = f"🔧 Making {method} request:\n"
     debug_info += f"   URL: {url}\n"
     if params:
@@ -74,10 +159,12 @@ def debug_http_request(method, url, params=None, headers=None):
 
 def debug_http_response(response):
     """Print HTTP response details for debugging"""
+    if not DEBUG_ENABLED:
+        return ""
     debug_info = f"🔧 Response received:\n"
     debug_info += f"   Status Code: {response.status_code}\n"
     debug_info += f"   Response URL: {response.url}\n"
-    debug_info += f"   Headers: {dict(response.headers)}\n"
+    debug_info += "   Headers: " + ", ".join(f"{k}: {v}" for k, v in response.headers.items()) + "\n"
     return debug_info
 
 def display_debug_info(container, debug_info, height=400):
@@ -93,8 +180,10 @@ def display_debug_info(container, debug_info, height=400):
     if container is None:
         return
     
-    # Create a unique key based on debug info hash to avoid duplicate widget IDs
-    debug_hash = hash(debug_info) % 100000
+    # Number debug displays within this run to avoid duplicate widget IDs;
+    # main() resets the counter so keys stay stable across reruns
+    debug_hash = st.session_state.setdefault('_debug_counter', 0)
+    st.session_state['_debug_counter'] += 1
     unique_key = f"debug_{debug_hash}"
     copy_key = f"copy_btn_{debug_hash}"
     success_key = f"copy_success_{debug_hash}"
@@ -131,14 +220,11 @@ def generate_mp4_url(first_name, last_name, hometown, state):
     Generate the expected MP4 URL based on the observed naming pattern.
     Pattern: https://d3mqiwdgu1iop6.cloudfront.net/videos/first-last-hometown-state.mp4
     """
-    # Clean and format the components for the filename
-    first_clean = first_name.lower().replace(' ', '-')
-    last_clean = last_name.lower().replace(' ', '-')
-    hometown_clean = hometown.lower().replace(' ', '-').replace(',', '')
-    state_clean = state.lower()
+    # Lowercase once and clean every component in a single translate pass
+    slug = f"{first_name}-{last_name}-{hometown}-{state}".lower().translate(_MP4_TRANS)
     
     # Generate the filename and URL
-    filename = f"{first_clean}-{last_clean}-{hometown_clean}-{state_clean}.mp4"
+    filename = f"{slug}.mp4"
     mp4_url = f"https://d3mqiwdgu1iop6.cloudfront.net/videos/{filename}"
     
     return mp4_url, filename
@@ -147,43 +233,55 @@ def check_mp4_accessibility(mp4_url, debug_container=None):
     """
     Check if the MP4 file is accessible and downloadable.
     """
-    debug_info = ""
-    debug_info += f"🔧 Checking MP4 accessibility: {mp4_url}\n"
+    debug_info = DebugLog()
+    debug_info.append(f"🔧 Checking MP4 accessibility: {mp4_url}\n")
     
     try:
         # Make a HEAD request to check accessibility without downloading the entire file
-        debug_info += debug_http_request("HEAD", mp4_url)
-        response = requests.head(mp4_url, timeout=10, allow_redirects=True)
-        debug_info += debug_http_response(response)
+        debug_info.append(debug_http_request("HEAD", mp4_url))
+        response = get_http_session().head(mp4_url, timeout=10, allow_redirects=True)
+        debug_info.append(debug_http_response(response))
         
         # Check if the request was successful and content type is video/mp4
         if response.status_code == 200:
             content_type = response.headers.get('content-type', '').lower()
-            debug_info += f"🔧 Content-Type: {content_type}\n"
+            debug_info.append(f"🔧 Content-Type: {content_type}\n")
             if 'video/mp4' in content_type or 'application/octet-stream' in content_type:
-                debug_info += "🔧 MP4 is accessible via HEAD request\n"
+                debug_info.append("🔧 MP4 is accessible via HEAD request\n")
                 if debug_container:
-                    display_debug_info(debug_container, debug_info, height=300)
-                return True, debug_info
+                    display_debug_info(debug_container, str(debug_info), height=300)
+                return True, str(debug_info)
+        
+        # A client error on HEAD (other than HEAD being disallowed) is definitive,
+        # so skip the range request round-trip on the common miss path
+        if 400 <= response.status_code < 500 and response.status_code != 405:
+            debug_info.append(f"🔧 MP4 not accessible (HTTP {response.status_code})\n")
+            if debug_container:
+                display_debug_info(debug_container, str(debug_info), height=300)
+            return False, str(debug_info)
         
         # If HEAD request fails or gives unexpected response, try a GET with range
         headers = {'Range': 'bytes=0-1'}  # Just request first 2 bytes to check accessibility
-        debug_info += debug_http_request("GET", mp4_url, headers=headers)
-        response = requests.get(mp4_url, headers=headers, timeout=10, stream=True)
-        debug_info += debug_http_response(response)
+        debug_info.append(debug_http_request("GET", mp4_url, headers=headers))
+        with get_http_session().get(mp4_url, headers=headers, timeout=10, stream=True) as response:
+            debug_info.append(debug_http_response(response))
+            accessible = response.status_code in [200, 206]
+            # Read the small range/error body so the connection goes back to the pool;
+            # a 200 means Range was ignored, so leave that (full) body unread
+            if response.status_code != 200:
+                response.content
         
-        accessible = response.status_code in [200, 206]
-        debug_info += f"🔧 MP4 accessible via range request: {accessible}\n"
+        debug_info.append(f"🔧 MP4 accessible via range request: {accessible}\n")
         
         if debug_container:
-            display_debug_info(debug_container, debug_info, height=300)
-        return accessible, debug_info
+            display_debug_info(debug_container, str(debug_info), height=300)
+        return accessible, str(debug_info)
         
     except requests.exceptions.RequestException as e:
-        debug_info += f"🔧 MP4 accessibility check failed: {str(e)}\n"
+        debug_info.append(f"🔧 MP4 accessibility check failed: {str(e)}\n")
         if debug_container:
-            display_debug_info(debug_container, debug_info, height=300)
-        return False, debug_info
+            display_debug_info(debug_container, str(debug_info), height=300)
+        return False, str(debug_info)
 
 def download_mp4(mp4_url, filename=None, download_dir="downloads"):
     """
@@ -199,69 +297,111 @@ def download_mp4(mp4_url, filename=None, download_dir="downloads"):
     filepath = os.path.join(download_dir, filename)
     
     try:
-        response = requests.get(mp4_url, stream=True, timeout=30)
-        
-        if response.status_code == 200:
+        with get_http_session().get(mp4_url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            
+            # Copy the raw stream in 1 MiB chunks; decode_content undoes any gzip transfer encoding
+            response.raw.read = functools.partial(response.raw.read, decode_content=True)
             with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            return True, filepath
-        else:
-            return False, f"Failed to download: HTTP {response.status_code}"
+                shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+        return True, filepath
+    except requests.exceptions.HTTPError as e:
+        return False, f"Failed to download: HTTP {e.response.status_code}"
     except Exception as e:
         return False, f"Download error: {str(e)}"
 
-@st.cache_data
+@st.cache_resource
+def get_download_jobs():
+    """
+    Process-wide registry of background downloads keyed by MP4 URL, so a
+    download started in one rerun can be reported on later ones.
+    """
+    return {}
+
+def start_background_download(mp4_url):
+    """
+    Run download_mp4 on a background thread so the script isn't blocked.
+    Returns the job dict; 'success' and 'message' are valid once 'done' is True.
+    A running or successful job for the same URL is reused rather than restarted.
+    """
+    jobs = get_download_jobs()
+    job = jobs.get(mp4_url)
+    if job and (not job['done'] or job['success']):
+        return job
+    
+    job = {'done': False, 'success': False, 'message': ''}
+    jobs[mp4_url] = job
+    
+    def run():
+        job['success'], job['message'] = download_mp4(mp4_url)
+        job['done'] = True
+    
+    threading.Thread(target=run, daemon=True).start()
+    return job
+
+def show_download_status(job):
+    """
+    Render the current state of a background download job.
+    """
+    if not job['done']:
+        st.info("⏳ Download running in the background; its status will show on the next interaction.")
+    elif job['success']:
+        st.success("✅ Download successful!")
+        st.info(f"File saved as: `{job['message']}`")
+    else:
+        st.error(f"❌ Download failed: {job['message']}")
+
+@st.cache_data(persist="disk", show_spinner=False)
+def parse_iowa_counties_csv(csv_path):
+    """
+    Parse the Iowa cities CSV into (county -> cities, sorted counties).
+    Raises on a missing or malformed file so failures are never persisted
+    to the disk cache.
+    """
+    # The mapping is a plain two-column file with no quoting, so split lines
+    # directly instead of going through a CSV parser
+    with open(csv_path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lines = mm.read().decode('utf-8-sig').splitlines()
+    
+    header = lines[0].split(',')
+    city_index = header.index('City')
+    county_index = header.index('County')
+    row_length = max(city_index, county_index) + 1
+    
+    # Normalize, skip empty rows and deduplicate in a single pass
+    county_sets = defaultdict(set)
+    for line in lines[1:]:
+        row = line.split(',')
+        if len(row) < row_length:
+            continue
+        
+        city = ' '.join(row[city_index].split())
+        county = ' '.join(row[county_index].split())
+        if city and county:
+            county_sets[county].add(city)
+    
+    county_cities = {county: sorted(cities) for county, cities in county_sets.items()}
+    counties = sorted(county_cities.keys())
+    
+    return county_cities, counties
+
 def load_iowa_counties_and_cities(csv_path="city-county-mapping.csv"):
     """
     Parse the Iowa cities CSV and extract counties with their cities.
     Returns a dictionary mapping county names to lists of city names.
     Also returns a list of all counties sorted alphabetically.
     """
-    county_cities = {}
-    
     if not os.path.exists(csv_path):
         st.error(f"CSV file not found: {csv_path}")
         return {}, []
     
     try:
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
-            
-            # Process each row in the CSV
-            for row in csv_reader:
-                city = row.get('City', '').strip()
-                county = row.get('County', '').strip()
-                
-                # Skip empty rows
-                if not city or not county:
-                    continue
-                
-                # Normalize whitespace
-                city = re.sub(r'\s+', ' ', city)
-                county = re.sub(r'\s+', ' ', county)
-                
-                # Initialize county if not seen before
-                if county not in county_cities:
-                    county_cities[county] = []
-                
-                # Add city to county if not already present
-                if city not in county_cities[county]:
-                    county_cities[county].append(city)
-        
-        # Sort cities within each county and counties themselves
-        for county in county_cities:
-            county_cities[county].sort()
-        
-        counties = sorted(county_cities.keys())
-        
-        return county_cities, counties
-        
+        return parse_iowa_counties_csv(csv_path)
     except Exception as e:
         st.error(f"Error parsing CSV: {str(e)}")
         return {}, []
 
-@st.cache_data
 def load_iowa_cities(csv_path="city-county-mapping.csv"):
     """
     Parse the Iowa cities CSV and extract city names.
@@ -269,98 +409,82 @@ def load_iowa_cities(csv_path="city-county-mapping.csv"):
     """
     county_cities, counties = load_iowa_counties_and_cities(csv_path)
     
-    # Flatten all cities from all counties
-    all_cities = []
-    for cities in county_cities.values():
-        all_cities.extend(cities)
-    
-    # Remove duplicates and sort
-    all_cities = sorted(list(set(all_cities)))
-    return all_cities
+    # Flatten, deduplicate and sort all cities from all counties in one pass
+    return sorted({city for cities in county_cities.values() for city in cities})
 
+@st.cache_resource(max_entries=4096, show_spinner=False)
 def generate_hometown_permutations(hometown):
     """
     Generate multiple formatting permutations of the hometown to try.
     This helps handle variations in spacing and formatting.
+    Results are cached across reruns and returned as an immutable tuple;
+    cache_resource shares that tuple directly instead of pickling a copy per hit.
     """
+    # Already-canonical single-word names (most CSV cities) only need the one
+    # probe; multi-word names still need their no-space variant
+    if (hometown and ' ' not in hometown and hometown.istitle()
+            and not hometown.lower().startswith('lowa')):
+        return (hometown,)
+    
     permutations = []
+    seen = set()
+    
+    def add(candidate):
+        # Keep first occurrence order while avoiding repeated list scans
+        if candidate not in seen:
+            seen.add(candidate)
+            permutations.append(candidate)
     
     # 1. Original format (as entered)
-    permutations.append(hometown)
+    add(hometown)
     
     # 2. Try capitalizing just the first character (handles "lowa City" -> "Lowa City")
     if hometown and hometown[0].islower():
-        first_capitalized = hometown[0].upper() + hometown[1:]
-        if first_capitalized != hometown:
-            permutations.append(first_capitalized)
+        add(hometown[0].upper() + hometown[1:])
     
     # 2b. Fix common typo: "lowa" -> "Iowa" (handles CSV data issue)
     if hometown and hometown.lower().startswith('lowa'):
         # Replace "lowa" or "Lowa" at the start with "Iowa"
-        iowa_fixed = re.sub(r'^[Ll]owa\b', 'Iowa', hometown)
-        if iowa_fixed != hometown and iowa_fixed not in permutations:
-            permutations.append(iowa_fixed)
+        add(_RE_LOWA.sub('Iowa', hometown))
     
     # 3. Try title case (capitalize first letter of each word)
     # This handles cases like "west des moines" -> "West Des Moines"
-    title_case = hometown.title()
-    if title_case != hometown and title_case not in permutations:
-        permutations.append(title_case)
+    add(hometown.title())
     
     # 4. Normalize spaces (ensure single spaces between words)
-    normalized = ' '.join(hometown.split())
-    if normalized != hometown and normalized not in permutations:
-        permutations.append(normalized)
+    add(' '.join(hometown.split()))
     
     # 5. Remove all spaces
     no_spaces = hometown.replace(' ', '')
-    if no_spaces != hometown:
-        permutations.append(no_spaces)
+    add(no_spaces)
     
     # 6. Insert spaces before capital letters (e.g., "DesMoines" -> "Des Moines")
     # This handles cases where words are concatenated without spaces
-    spaced_capitals = re.sub(r'([a-z])([A-Z])', r'\1 \2', hometown)
-    if spaced_capitals != hometown and spaced_capitals not in permutations:
-        permutations.append(spaced_capitals)
+    add(_RE_CAMEL.sub(r'\1 \2', hometown))
     
     # 7. Try inserting spaces before capital letters in the no-spaces version
     if no_spaces != hometown:
-        spaced_from_no_spaces = re.sub(r'([a-z])([A-Z])', r'\1 \2', no_spaces)
-        if spaced_from_no_spaces != no_spaces and spaced_from_no_spaces not in permutations:
-            permutations.append(spaced_from_no_spaces)
+        add(_RE_CAMEL.sub(r'\1 \2', no_spaces))
     
     # 8. Try common multi-word patterns (e.g., "WestDesMoines" -> "West Des Moines")
     # Split on capital letters and join with spaces
-    if re.search(r'[a-z][A-Z]', hometown):
-        words = re.findall(r'[A-Z][a-z]*|[a-z]+', hometown)
+    if _RE_HAS_CAMEL.search(hometown):
+        words = _RE_WORDS.findall(hometown)
         if len(words) > 1:
-            reconstructed = ' '.join(words)
-            if reconstructed not in permutations:
-                permutations.append(reconstructed)
+            add(' '.join(words))
     
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_permutations = []
-    for perm in permutations:
-        if perm not in seen:
-            seen.add(perm)
-            unique_permutations.append(perm)
-    
-    return unique_permutations
+    return tuple(permutations)
 
-def fast_check_cache_hit(url, timeout=5):
+def build_admissions_url(first_name, last_name, hometown, state):
     """
-    Fast check for cache hit using X-Cache header.
-    Returns (is_hit, response) where is_hit is True if X-Cache contains 'Hit'.
-    This is much faster than checking MP4 accessibility.
+    Build the admissions portal URL manually to match the exact format that works.
     """
-    try:
-        response = requests.get(url, timeout=timeout)
-        cache_header = response.headers.get('X-Cache', '').lower()
-        is_hit = 'hit' in cache_header
-        return is_hit, response
-    except requests.exceptions.RequestException:
-        return False, None
+    encoded_hometown = quote(hometown)  # This encodes spaces as %20
+    home_param = f"{encoded_hometown},{state}"
+    return f"https://your.admissions.uiowa.edu/?first={first_name.lower()}&last={last_name.lower()}&home={home_param}"
+
+# Removed fast_check_cache_hit - the MP4 URL is deterministic, so probe CloudFront
+# directly instead of paying an extra admissions-portal round-trip per permutation
 
 def check_admissions_hit(first_name, last_name, hometown, state, debug_container=None, progress_callback=None):
     """
@@ -376,57 +500,36 @@ def check_admissions_hit(first_name, last_name, hometown, state, debug_container
         debug_container: Streamlit container for debug output
         progress_callback: Optional callback function(current, total, current_city) for progress updates
     """
-    debug_info = ""
+    debug_info = DebugLog()
     
     # Generate hometown permutations to try
     hometown_permutations = generate_hometown_permutations(hometown)
-    debug_info += f"🔧 Generated {len(hometown_permutations)} hometown permutations to try:\n"
+    debug_info.append(f"🔧 Generated {len(hometown_permutations)} hometown permutations to try:\n")
     for i, perm in enumerate(hometown_permutations, 1):
-        debug_info += f"   {i}. '{perm}'\n"
-    debug_info += "\n"
+        debug_info.append(f"   {i}. '{perm}'\n")
+    debug_info.append("\n")
     
     # Try each permutation until we find a hit
     for perm_index, hometown_perm in enumerate(hometown_permutations, 1):
         if progress_callback:
             progress_callback(perm_index, len(hometown_permutations), hometown_perm)
         
-        debug_info += f"🔧 Trying permutation {perm_index}/{len(hometown_permutations)}: '{hometown_perm}'\n"
-        
-        # Build the URL manually to match the exact format that works
-        encoded_hometown = quote(hometown_perm)  # This encodes spaces as %20
-        home_param = f"{encoded_hometown},{state}"
+        debug_info.append(f"🔧 Trying permutation {perm_index}/{len(hometown_permutations)}: '{hometown_perm}'\n")
         
-        # Build the complete URL manually
-        url = f"https://your.admissions.uiowa.edu/?first={first_name.lower()}&last={last_name.lower()}&home={home_param}"
+        # The portal URL is only reported back; the MP4 probe decides the hit
+        url = build_admissions_url(first_name, last_name, hometown_perm, state)
         
         try:
-            # Check cache header first to quickly determine if this is a hit
-            is_cache_hit, response = fast_check_cache_hit(url, timeout=5)
-            
-            if not response:
-                debug_info += f"❌ Request failed for '{hometown_perm}', trying next...\n\n"
-                continue
-            
-            # Debug: Print the request being made
-            debug_info += debug_http_request("GET", url)
-            debug_info += debug_http_response(response)
-            
-            # If cache shows miss, skip expensive MP4 check
-            if not is_cache_hit:
-                debug_info += f"❌ Cache miss for '{hometown_perm}', skipping MP4 check...\n\n"
-                continue
-            
-            # Only check MP4 if we have a cache hit
             expected_mp4_url, expected_filename = generate_mp4_url(first_name, last_name, hometown_perm, state)
-            debug_info += f"🔧 Generated MP4 URL: {expected_mp4_url}\n"
+            debug_info.append(f"🔧 Generated MP4 URL: {expected_mp4_url}\n")
             
             # Check if the generated MP4 URL is accessible
             mp4_accessible, mp4_debug = check_mp4_accessibility(expected_mp4_url, None)
-            debug_info += mp4_debug
+            debug_info.append(mp4_debug)
             
             # If we found a hit, return immediately
             if mp4_accessible:
-                debug_info += f"✅ Hit found with permutation '{hometown_perm}'!\n"
+                debug_info.append(f"✅ Hit found with permutation '{hometown_perm}'!\n")
                 
                 # Analyze the response
                 result = {
@@ -435,8 +538,7 @@ def check_admissions_hit(first_name, last_name, hometown, state, debug_container
                     'hometown': f"{hometown_perm}, {state}",
                     'hometown_original': hometown,
                     'hometown_used': hometown_perm,
-                    'url_used': response.url,
-                    'status_code': response.status_code,
+                    'url_used': url,
                     'hit_found': True,
                     'mp4_link': expected_mp4_url,
                     'mp4_accessible': True,
@@ -444,23 +546,23 @@ def check_admissions_hit(first_name, last_name, hometown, state, debug_container
                     'permutation_index': perm_index,
                     'total_permutations': len(hometown_permutations),
                     'timestamp': datetime.now().isoformat(),
-                    'debug_info': debug_info
+                    'debug_info': str(debug_info)
                 }
                 
                 if debug_container:
-                    display_debug_info(debug_container, debug_info, height=400)
+                    display_debug_info(debug_container, str(debug_info), height=400)
                     
                 return result
             else:
-                debug_info += f"❌ No hit with permutation '{hometown_perm}', trying next...\n\n"
+                debug_info.append(f"❌ No hit with permutation '{hometown_perm}', trying next...\n\n")
                 
         except requests.exceptions.RequestException as e:
-            debug_info += f"🔧 Request exception with permutation '{hometown_perm}': {str(e)}\n"
-            debug_info += f"   Trying next permutation...\n\n"
+            debug_info.append(f"🔧 Request exception with permutation '{hometown_perm}': {str(e)}\n")
+            debug_info.append(f"   Trying next permutation...\n\n")
             continue
     
     # If we get here, none of the permutations worked
-    debug_info += f"❌ No hit found with any of the {len(hometown_permutations)} permutations tried.\n"
+    debug_info.append(f"❌ No hit found with any of the {len(hometown_permutations)} permutations tried.\n")
     
     # Return failure result with the last attempted permutation
     result = {
@@ -470,7 +572,6 @@ def check_admissions_hit(first_name, last_name, hometown, state, debug_container
         'hometown_original': hometown,
         'hometown_used': hometown_permutations[-1] if hometown_permutations else hometown,
         'url_used': None,
-        'status_code': None,
         'hit_found': False,
         'mp4_link': None,
         'mp4_accessible': False,
@@ -478,18 +579,151 @@ def check_admissions_hit(first_name, last_name, hometown, state, debug_container
         'permutation_index': len(hometown_permutations),
         'total_permutations': len(hometown_permutations),
         'timestamp': datetime.now().isoformat(),
-        'debug_info': debug_info
+        'debug_info': str(debug_info)
     }
     
     if debug_container:
-        display_debug_info(debug_container, debug_info, height=400)
+        display_debug_info(debug_container, str(debug_info), height=400)
         
     return result
 
+@st.cache_resource
+def load_known_mp4_set(path="known_videos.txt"):
+    """
+    Load known video filenames (one per line), e.g. produced offline from a
+    bucket listing. Returns an empty set if the file doesn't exist.
+    """
+    if not os.path.exists(path):
+        return frozenset()
+    
+    with open(path, 'r', encoding='utf-8') as file:
+        return frozenset(line.strip() for line in file if line.strip())
+
+def probe_candidates_concurrently(candidates, progress_bar=None):
+    """
+    Probe candidate MP4 URLs concurrently. With httpx/h2 installed the probes run
+    via probe_candidates_http2 on the shared HTTP/2 client's event loop (see
+    get_http2_client) while this thread updates the progress bar; otherwise they
+    fall back to a thread pool of CITY_SEARCH_WORKERS using the requests session.
+    Returns (hit, debug_info) where hit is the earliest candidate among those
+    completed when the first hit arrives, or None if nothing matched.
+    """
+    debug_info = DebugLog()
+    if not candidates:
+        return None, str(debug_info)
+    
+    if HTTP2_AVAILABLE:
+        loop, client = get_http2_client()
+        completed = [0]
+        future = asyncio.run_coroutine_threadsafe(probe_candidates_http2(client, candidates, completed), loop)
+        # Progress widgets belong to the script thread, so poll from here
+        while True:
+            try:
+                return future.result(timeout=0.1)
+            except FutureTimeoutError:
+                if progress_bar:
+                    progress_bar.progress(completed[0] / len(candidates))
+    
+    executor = ThreadPoolExecutor(max_workers=CITY_SEARCH_WORKERS)
+    try:
+        futures = {
+            executor.submit(check_mp4_accessibility, candidate[5], None): candidate
+            for candidate in candidates
+        }
+        
+        for completed, future in enumerate(as_completed(futures), 1):
+            if progress_bar:
+                progress_bar.progress(completed / len(futures))
+            
+            mp4_accessible, mp4_debug = future.result()
+            if not mp4_accessible:
+                debug_info.append(f"   ❌ No match with '{futures[future][4]}' ({futures[future][3]})\n")
+                continue
+            
+            # Prefer the earliest city among hits that have completed so far
+            hits = [
+                futures[f] for f in futures
+                if f.done() and not f.cancelled() and f.result()[0]
+            ]
+            return min(hits), str(debug_info)
+    finally:
+        # Stop any probes that haven't started once we have an answer
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return None, str(debug_info)
+
+@st.cache_resource
+def get_http2_client():
+    """
+    Long-lived HTTP/2 client and the background event loop that owns it, so
+    connections and TLS sessions are reused across searches. The pool allows
+    CITY_SEARCH_WORKERS connections, so probes still run in parallel when ALPN
+    falls back to HTTP/1.1.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="http2-probes", daemon=True).start()
+    limits = httpx.Limits(max_connections=CITY_SEARCH_WORKERS, max_keepalive_connections=CITY_SEARCH_WORKERS)
+    client = httpx.AsyncClient(http2=True, limits=limits, timeout=10.0, follow_redirects=True)
+    return loop, client
+
+async def probe_candidates_http2(client, candidates, completed):
+    """
+    Probe candidate MP4 URLs with HEAD requests multiplexed over the shared
+    HTTP/2 client. Same contract as probe_candidates_concurrently; completed[0]
+    is updated with the number of finished probes for progress reporting.
+    """
+    debug_info = DebugLog()
+    
+    async def probe(candidate):
+        try:
+            response = await client.head(candidate[5])
+        except httpx.HTTPError:
+            return False
+        
+        content_type = response.headers.get('content-type', '').lower()
+        if response.status_code == 200 and ('video/mp4' in content_type or 'application/octet-stream' in content_type):
+            return True
+        if 400 <= response.status_code < 500 and response.status_code != 405:
+            return False
+        
+        # Inconclusive HEAD; let the regular check try a range request
+        accessible, _ = await asyncio.to_thread(check_mp4_accessibility, candidate[5], None)
+        return accessible
+    
+    tasks = {asyncio.ensure_future(probe(candidate)): candidate for candidate in candidates}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            completed[0] = len(tasks) - len(pending)
+            
+            hits = []
+            for task in done:
+                if task.result():
+                    hits.append(tasks[task])
+                else:
+                    debug_info.append(f"   ❌ No match with '{tasks[task][4]}' ({tasks[task][3]})\n")
+            
+            if hits:
+                # Prefer the earliest city among hits that have completed so far
+                hits += [
+                    tasks[task] for task in tasks
+                    if task not in pending and task not in done and task.result()
+                ]
+                return min(hits), str(debug_info)
+    finally:
+        # Stop outstanding probes once we have an answer
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    
+    return None, str(debug_info)
+
 def search_with_city_iteration(first_name, last_name, state, cities, debug_container=None, progress_bar=None):
     """
-    Search for a student by iterating through a list of cities.
-    Stops when a hit is found.
+    Search for a student by probing every city/permutation MP4 concurrently.
+    Stops when a hit is found; the earliest city in the list wins if several
+    cities hit before the remaining probes are cancelled.
     
     Args:
         first_name: Student's first name
@@ -499,55 +733,69 @@ def search_with_city_iteration(first_name, last_name, state, cities, debug_conta
         debug_container: Streamlit container for debug output
         progress_bar: Streamlit progress bar component
     """
-    debug_info = f"🔍 Searching through {len(cities)} cities for {first_name} {last_name}...\n\n"
+    debug_info = DebugLog()
+    debug_info.append(f"🔍 Searching through {len(cities)} cities for {first_name} {last_name}...\n\n")
     
     if progress_bar:
         progress_bar.progress(0)
     
-    # Iterate through cities sequentially
+    # Build every (city, permutation) candidate up front so probes can run in parallel
+    candidates = []
     for city_index, city in enumerate(cities, 1):
-        if progress_bar:
-            progress_bar.progress(city_index / len(cities))
-        
-        debug_info += f"📍 Trying city {city_index}/{len(cities)}: {city}\n"
-        
-        # Try this city with all its permutations
-        result = check_admissions_hit(
-            first_name, 
-            last_name, 
-            city, 
-            state, 
-            debug_container=None,  # Don't show individual city debug, only final
-            progress_callback=None
-        )
+        permutations = generate_hometown_permutations(city)
+        for perm_index, perm in enumerate(permutations, 1):
+            mp4_url, filename = generate_mp4_url(first_name, last_name, perm, state)
+            candidates.append((city_index, perm_index, len(permutations), city, perm, mp4_url, filename))
+    
+    # Try candidates matching known video filenames first; probe the rest only if needed
+    known_videos = load_known_mp4_set()
+    known_candidates = [c for c in candidates if c[6] in known_videos]
+    hit = None
+    
+    if known_candidates:
+        debug_info.append(f"📚 {len(known_candidates)} candidate(s) match known videos, probing those first\n")
+        hit, probe_debug = probe_candidates_concurrently(known_candidates)
+        debug_info.append(probe_debug)
+    
+    if hit is None:
+        remaining = [c for c in candidates if c[6] not in known_videos]
+        hit, probe_debug = probe_candidates_concurrently(remaining, progress_bar)
+        debug_info.append(probe_debug)
+    
+    if hit is not None:
+        city_index, perm_index, total_perms, city, perm, mp4_url, _ = hit
         
-        # If we found a hit, return immediately
-        if result['hit_found']:
-            debug_info += f"✅ Found match with city: {city}\n"
-            debug_info += result['debug_info']
-            result['debug_info'] = debug_info
-            result['cities_tried'] = city_index
-            result['total_cities'] = len(cities)
-            result['city_found'] = city
-            
-            if debug_container:
-                display_debug_info(debug_container, debug_info, height=400)
-            
-            if progress_bar:
-                progress_bar.progress(1.0)
-            
-            return result
+        debug_info.append(f"✅ Found match with city: {city}\n")
+        result = {
+            'first_name': first_name,
+            'last_name': last_name,
+            'hometown': f"{perm}, {state}",
+            'hometown_original': city,
+            'hometown_used': perm,
+            'url_used': build_admissions_url(first_name, last_name, perm, state),
+            'hit_found': True,
+            'mp4_link': mp4_url,
+            'mp4_accessible': True,
+            'details': f'MP4 file found and accessible (used permutation: "{perm}")',
+            'permutation_index': perm_index,
+            'total_permutations': total_perms,
+            'cities_tried': city_index,
+            'total_cities': len(cities),
+            'city_found': city,
+            'timestamp': datetime.now().isoformat(),
+            'debug_info': str(debug_info)
+        }
         
-        # Include detailed debug info for failed cities if debug is enabled
         if debug_container:
-            debug_info += result['debug_info']
-            # Update debug output in real-time
-            display_debug_info(debug_container, debug_info, height=400)
-        else:
-            debug_info += f"   ❌ No match with {city}\n"
+            display_debug_info(debug_container, str(debug_info), height=400)
+        
+        if progress_bar:
+            progress_bar.progress(1.0)
+        
+        return result
     
     # If we get here, no city worked
-    debug_info += f"\n❌ No match found after trying {len(cities)} cities.\n"
+    debug_info.append(f"\n❌ No match found after trying {len(cities)} cities.\n")
     
     if progress_bar:
         progress_bar.progress(1.0)
@@ -559,7 +807,6 @@ def search_with_city_iteration(first_name, last_name, state, cities, debug_conta
         'hometown_original': None,
         'hometown_used': None,
         'url_used': None,
-        'status_code': None,
         'hit_found': False,
         'mp4_link': None,
         'mp4_accessible': False,
@@ -568,15 +815,84 @@ def search_with_city_iteration(first_name, last_name, state, cities, debug_conta
         'total_cities': len(cities),
         'city_found': None,
         'timestamp': datetime.now().isoformat(),
-        'debug_info': debug_info
+        'debug_info': str(debug_info)
     }
     
     if debug_container:
-        display_debug_info(debug_container, debug_info, height=400)
+        display_debug_info(debug_container, str(debug_info), height=400)
     
     return result
 
+def render_result(result, key_prefix="", expected_url=None, debug_container=None):
+    """
+    Render a search result (hit or miss) with its video and download controls.
+    key_prefix keeps widget keys unique when rendered from more than one place.
+    """
+    if result.get('hit_found'):
+        st.markdown('<div class="success-box">', unsafe_allow_html=True)
+        st.success(f"✅ **Video Found!**")
+        st.write(f"**Student:** {result['first_name']} {result['last_name']}")
+        st.write(f"**Hometown:** {result['hometown']}")
+        
+        # Show county info if applicable
+        if 'county_searched' in result:
+            st.info(f"🏛️ Searched in **{result['county_searched']} County**")
+        
+        # Show city iteration info if applicable
+        if 'city_found' in result and result['city_found']:
+            st.info(f"📍 Found city: **{result['city_found']}** (tried {result.get('cities_tried', 0)} of {result.get('total_cities', 0)} cities)")
+        
+        # Show permutation info if different from original
+        if 'hometown_original' in result and result['hometown_original'] and result['hometown_original'] != result.get('hometown_used', ''):
+            st.info(f"💡 Used hometown format: '{result['hometown_used']}' (original: '{result['hometown_original']}')")
+        if 'permutation_index' in result:
+            st.caption(f"Found on permutation {result['permutation_index']} of {result['total_permutations']}")
+        st.write(f"**MP4 Link:** {result['mp4_link']}")
+        
+        # Display video
+        st.video(result['mp4_link'])
+        
+        # Download button, plus progress of any background download for this video
+        job = get_download_jobs().get(result['mp4_link'])
+        if st.button("💾 Download Video", type="secondary", use_container_width=True, key=f"{key_prefix}download"):
+            job = start_background_download(result['mp4_link'])
+        if job:
+            show_download_status(job)
+            
+            # Offer to show file location
+            if job['done'] and job['success'] and st.button("📁 Show in File Explorer", key=f"{key_prefix}show_file"):
+                os.system(f'open "{os.path.dirname(job["message"])}"')
+    else:
+        st.markdown('<div class="error-box">', unsafe_allow_html=True)
+        st.error(f"❌ **No Video Found**")
+        st.write(f"**Student:** {result['first_name']} {result['last_name']}")
+        st.write(f"**Hometown:** {result['hometown']}")
+        
+        # Show county info if applicable
+        if 'county_searched' in result:
+            st.write(f"**County Searched:** {result['county_searched']} County")
+        
+        # Show city iteration info if applicable
+        if 'total_cities' in result:
+            st.write(f"**Cities Tried:** {result.get('cities_tried', 0)} of {result['total_cities']}")
+        if 'total_permutations' in result:
+            st.write(f"**Permutations Tried:** {result['total_permutations']}")
+        st.write(f"**Details:** {result['details']}")
+        
+        if expected_url:
+            st.write(f"**Expected URL:** {expected_url}")
+    
+    if debug_container:
+        display_debug_info(debug_container, result.get('debug_info', ''), height=400)
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
 def main():
+    global DEBUG_ENABLED
+    
+    prewarm_dns()
+    st.session_state['_debug_counter'] = 0
+    
     # Header
     st.markdown('<div class="main-header">🎓 University of Iowa Admissions Video Finder</div>', unsafe_allow_html=True)
     
@@ -663,13 +979,17 @@ State: IA
         # Advanced options
         with st.expander("Advanced Options"):
             show_debug = st.checkbox("Show debug information", value=False)
+            DEBUG_ENABLED = show_debug
             auto_download = st.checkbox("Auto-download when video found", value=False)
     
     with col2:
         st.subheader("Actions")
         
-        # Store and retrieve search results from session state
-        search_key = f"search_result_{first_name}_{last_name}_{state}_{selected_county or hometown}"
+        # Key stored results and download state by a hash of the query
+        search_key = hashlib.md5(
+            f"{first_name}|{last_name}|{hometown}|{state}|{selected_county}".encode()
+        ).hexdigest()
+        cached_result = st.session_state.get(f"result_{search_key}")
         
         # Check if we have a stored result
         stored_result = st.session_state.get('last_search_result')
@@ -686,8 +1006,10 @@ State: IA
                 debug_container = st.empty()
                 progress_bar = st.empty()
                 
-                # Determine search mode
-                if selected_county:
+                # Determine search mode; a hit already found for this query is reused
+                if cached_result:
+                    result = cached_result
+                elif selected_county:
                     # County-based search mode
                     if state.upper() != "IA":
                         st.warning("⚠️ County search currently only supports Iowa (IA)")
@@ -725,138 +1047,27 @@ State: IA
                 if result:
                     st.session_state['last_search_result'] = result
                     st.session_state['last_search_debug'] = result.get('debug_info', '')
+                    if result.get('hit_found'):
+                        st.session_state[f"result_{search_key}"] = result
                 
                 # Display results
-                if result and result.get('hit_found'):
-                    st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                    st.success(f"✅ **Video Found!**")
-                    st.write(f"**Student:** {result['first_name']} {result['last_name']}")
-                    st.write(f"**Hometown:** {result['hometown']}")
-                    
-                    # Show county info if applicable
-                    if 'county_searched' in result:
-                        st.info(f"🏛️ Searched in **{result['county_searched']} County**")
-                    
-                    # Show city iteration info if applicable
-                    if 'city_found' in result and result['city_found']:
-                        st.info(f"📍 Found city: **{result['city_found']}** (tried {result.get('cities_tried', 0)} of {result.get('total_cities', 0)} cities)")
-                    
-                    # Show permutation info if different from original
-                    if 'hometown_original' in result and result['hometown_original'] and result['hometown_original'] != result.get('hometown_used', ''):
-                        st.info(f"💡 Used hometown format: '{result['hometown_used']}' (original: '{result['hometown_original']}')")
-                    if 'permutation_index' in result:
-                        st.caption(f"Found on permutation {result['permutation_index']} of {result['total_permutations']}")
-                    st.write(f"**MP4 Link:** {result['mp4_link']}")
-                    
-                    # Display video
-                    st.video(result['mp4_link'])
-                    
-                    # Download button
-                    if st.button("💾 Download Video", type="secondary", use_container_width=True):
-                        with st.spinner("Downloading video..."):
-                            success, message = download_mp4(result['mp4_link'])
-                            if success:
-                                st.success(f"✅ Download successful!")
-                                st.info(f"File saved as: `{message}`")
-                                
-                                # Offer to show file location
-                                if st.button("📁 Show in File Explorer"):
-                                    os.system(f'open "{os.path.dirname(message)}"')
-                            else:
-                                st.error(f"❌ Download failed: {message}")
-                    
-                    # Auto-download if enabled
-                    elif auto_download:
-                        with st.spinner("Auto-downloading video..."):
-                            success, message = download_mp4(result['mp4_link'])
-                            if success:
-                                st.success(f"✅ Auto-download successful!")
-                                st.info(f"File saved as: `{message}`")
-                            else:
-                                st.error(f"❌ Auto-download failed: {message}")
-                    
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                elif result:
-                    st.markdown('<div class="error-box">', unsafe_allow_html=True)
-                    st.error(f"❌ **No Video Found**")
-                    st.write(f"**Student:** {result['first_name']} {result['last_name']}")
-                    st.write(f"**Hometown:** {result['hometown']}")
-                    
-                    # Show county info if applicable
-                    if 'county_searched' in result:
-                        st.write(f"**County Searched:** {result['county_searched']} County")
-                    
-                    # Show city iteration info if applicable
-                    if 'total_cities' in result:
-                        st.write(f"**Cities Tried:** {result.get('cities_tried', 0)} of {result['total_cities']}")
-                    if 'total_permutations' in result:
-                        st.write(f"**Permutations Tried:** {result['total_permutations']}")
-                    st.write(f"**Details:** {result['details']}")
+                if result:
+                    # Auto-download if enabled (once per query)
+                    if result.get('hit_found') and auto_download and not st.session_state.get(f"downloaded_{search_key}"):
+                        st.session_state[f"downloaded_{search_key}"] = True
+                        start_background_download(result['mp4_link'])
                     
                     # Show generated URL for debugging (only if we have a hometown)
+                    expected_url = None
                     if hometown and hometown.strip():
                         expected_url, _ = generate_mp4_url(first_name, last_name, hometown, state)
-                        st.write(f"**Expected URL:** {expected_url}")
-                    st.markdown('</div>', unsafe_allow_html=True)
+                    
+                    render_result(result, key_prefix="fresh_", expected_url=expected_url)
         
         # Display stored results if they exist (for persistence across reruns)
         if stored_result and not st.session_state.get('search_button_clicked', False):
-            result = stored_result
             debug_container = st.empty() if show_debug else None
-            
-            if result.get('hit_found'):
-                st.markdown('<div class="success-box">', unsafe_allow_html=True)
-                st.success(f"✅ **Video Found!**")
-                st.write(f"**Student:** {result['first_name']} {result['last_name']}")
-                st.write(f"**Hometown:** {result['hometown']}")
-                
-                if 'county_searched' in result:
-                    st.info(f"🏛️ Searched in **{result['county_searched']} County**")
-                
-                if 'city_found' in result and result['city_found']:
-                    st.info(f"📍 Found city: **{result['city_found']}** (tried {result.get('cities_tried', 0)} of {result.get('total_cities', 0)} cities)")
-                
-                if 'hometown_original' in result and result['hometown_original'] and result['hometown_original'] != result.get('hometown_used', ''):
-                    st.info(f"💡 Used hometown format: '{result['hometown_used']}' (original: '{result['hometown_original']}')")
-                if 'permutation_index' in result:
-                    st.caption(f"Found on permutation {result['permutation_index']} of {result['total_permutations']}")
-                st.write(f"**MP4 Link:** {result['mp4_link']}")
-                
-                st.video(result['mp4_link'])
-                
-                if st.button("💾 Download Video", type="secondary", use_container_width=True, key="download_stored"):
-                    with st.spinner("Downloading video..."):
-                        success, message = download_mp4(result['mp4_link'])
-                        if success:
-                            st.success(f"✅ Download successful!")
-                            st.info(f"File saved as: `{message}`")
-                        else:
-                            st.error(f"❌ Download failed: {message}")
-                
-                if debug_container:
-                    display_debug_info(debug_container, result.get('debug_info', ''), height=400)
-                
-                st.markdown('</div>', unsafe_allow_html=True)
-            else:
-                st.markdown('<div class="error-box">', unsafe_allow_html=True)
-                st.error(f"❌ **No Video Found**")
-                st.write(f"**Student:** {result['first_name']} {result['last_name']}")
-                st.write(f"**Hometown:** {result['hometown']}")
-                
-                if 'county_searched' in result:
-                    st.write(f"**County Searched:** {result['county_searched']} County")
-                
-                if 'total_cities' in result:
-                    st.write(f"**Cities Tried:** {result.get('cities_tried', 0)} of {result['total_cities']}")
-                if 'total_permutations' in result:
-                    st.write(f"**Permutations Tried:** {result['total_permutations']}")
-                st.write(f"**Details:** {result['details']}")
-                
-                if debug_container:
-                    display_debug_info(debug_container, result.get('debug_info', ''), height=400)
-                
-                st.markdown('</div>', unsafe_allow_html=True)
+            render_result(stored_result, key_prefix="stored_", debug_container=debug_container)
         
         # Reset search button flag
         if st.session_state.get('search_button_clicked', False):
@@ -1,15 +1,59 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import requests
+import asyncio
+import httpx
+import orjson
+from cachetools import TTLCache
 from urllib.parse import quote
 import re
 import csv
+import functools
+import hashlib
+import mmap
 import os
+import pickle
+import tempfile
 from datetime import datetime
 from typing import Optional, List
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared HTTP client and load the county map once per worker."""
+    app.state.client = create_http_session()
+    app.state.counties = load_iowa_counties_and_cities()
+    app.state.counties_json, app.state.county_cities_json = serialize_counties(*app.state.counties)
+    yield
+    await app.state.client.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+# Maximum number of cities probed concurrently during a county search
+CITY_SEARCH_CONCURRENCY = 8
+
+# Maximum number of searches accepted by a single /api/search_batch request
+MAX_BATCH_SIZE = 10
+
+# Precomputed county -> cities maps, one per source CSV, rebuilt when stale
+COUNTIES_PICKLE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The county/city mapping is static, so clients may reuse those responses for an hour
+COUNTY_CACHE_CONTROL = "public, max-age=3600"
+
+# Per-process result caches keyed by (first, last, hometown, state); misses expire sooner
+_HIT_CACHE = TTLCache(maxsize=10_000, ttl=3600)
+_MISS_CACHE = TTLCache(maxsize=10_000, ttl=300)
+
+# MP4 statuses that prove the video does not exist (CloudFront answers 403 for missing objects)
+DEFINITIVE_MISS_STATUSES = {403, 404}
+
+# Streamed bodies up to this size are drained so the connection returns to the pool
+DRAIN_BODY_LIMIT = 64 * 1024
+
+# Hometown permutation patterns, compiled once
+_IOWA_RE = re.compile(r'^[Ll]owa\b')
+_CAPS_RE = re.compile(r'([a-z])([A-Z])')
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -55,27 +99,39 @@ def generate_mp4_url(first_name: str, last_name: str, hometown: str, state: str)
 
     return mp4_url, filename
 
-def check_mp4_accessibility(mp4_url: str):
-    """Check if the MP4 file is accessible."""
-    try:
-        response = requests.head(mp4_url, timeout=10, allow_redirects=True)
+async def check_mp4_accessibility(session: httpx.AsyncClient, mp4_url: str):
+    """Check if the MP4 file is accessible.
 
+    Returns (accessible, error, status_code); status_code is None if the request failed.
+    """
+    try:
+        response = await session.head(mp4_url, timeout=10, follow_redirects=True)
         if response.status_code == 200:
             content_type = response.headers.get('content-type', '').lower()
             if 'video/mp4' in content_type or 'application/octet-stream' in content_type:
-                return True, ""
+                return True, "", response.status_code
 
-        # Try GET with range if HEAD fails
-        headers = {'Range': 'bytes=0-1'}
-        response = requests.get(mp4_url, headers=headers, timeout=10, stream=True)
-        accessible = response.status_code in [200, 206]
-        return accessible, ""
-
-    except requests.exceptions.RequestException as e:
-        return False, str(e)
+        # A client error (other than HEAD being disallowed) is definitive;
+        # skip the extra range request on the common miss path
+        if 400 <= response.status_code < 500 and response.status_code != 405:
+            return False, "", response.status_code
 
+        # Try GET with range if HEAD is inconclusive
+        headers = {'Range': 'bytes=0-1'}
+        async with session.stream("GET", mp4_url, headers=headers, timeout=10) as response:
+            accessible = response.status_code in [200, 206]
+            # Drain the tiny range/error body so the connection is reused; a 200
+            # means the range was ignored, so skip downloading the whole video
+            if response.status_code != 200:
+                await response.aread()
+        return accessible, "", response.status_code
+
+    except httpx.HTTPError as e:
+        return False, str(e), None
+
+@functools.lru_cache(maxsize=4096)
 def generate_hometown_permutations(hometown: str):
-    """Generate multiple formatting permutations of the hometown."""
+    """Generate multiple formatting permutations of the hometown (cached, as a tuple)."""
     permutations = []
 
     # Original format
@@ -89,7 +145,7 @@ def generate_hometown_permutations(hometown: str):
 
     # Fix common typo: "lowa" -> "Iowa"
     if hometown and hometown.lower().startswith('lowa'):
-        iowa_fixed = re.sub(r'^[Ll]owa\b', 'Iowa', hometown)
+        iowa_fixed = _IOWA_RE.sub('Iowa', hometown)
         if iowa_fixed != hometown and iowa_fixed not in permutations:
             permutations.append(iowa_fixed)
 
@@ -109,7 +165,7 @@ def generate_hometown_permutations(hometown: str):
         permutations.append(no_spaces)
 
     # Insert spaces before capital letters
-    spaced_capitals = re.sub(r'([a-z])([A-Z])', r'\1 \2', hometown)
+    spaced_capitals = _CAPS_RE.sub(r'\1 \2', hometown)
     if spaced_capitals != hometown and spaced_capitals not in permutations:
         permutations.append(spaced_capitals)
 
@@ -121,81 +177,180 @@ def generate_hometown_permutations(hometown: str):
             seen.add(perm)
             unique_permutations.append(perm)
 
-    return unique_permutations
+    return tuple(unique_permutations)
 
-def fast_check_cache_hit(url: str, timeout=5):
-    """Fast check for cache hit using X-Cache header."""
+def build_admissions_url(first_name: str, last_name: str, hometown: str, state: str):
+    """Build the admissions portal URL for a name/hometown combination."""
+    home_param = f"{quote(hometown)},{state}"
+    return f"https://your.admissions.uiowa.edu/?first={first_name.lower()}&last={last_name.lower()}&home={home_param}"
+
+def create_http_session():
+    """Create an HTTP/2 client so concurrent probes multiplex over shared connections."""
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        timeout=5.0,
+    )
+
+async def fast_check_cache_hit(session: httpx.AsyncClient, url: str, timeout=5):
+    """Fast check for cache hit using X-Cache header. Returns (is_hit, status)."""
     try:
-        response = requests.get(url, timeout=timeout)
-        cache_header = response.headers.get('X-Cache', '').lower()
-        is_hit = 'hit' in cache_header
-        return is_hit, response
-    except requests.exceptions.RequestException:
+        # Only the headers matter, but small bodies are drained so the
+        # connection returns to the pool; large pages are dropped unread
+        async with session.stream("GET", url, timeout=timeout) as response:
+            cache_header = response.headers.get('X-Cache', '').lower()
+            is_hit = 'hit' in cache_header
+            content_length = response.headers.get('content-length')
+            if (response.status_code != 200 or
+                    (content_length is not None and content_length.isdigit()
+                     and int(content_length) <= DRAIN_BODY_LIMIT)):
+                await response.aread()
+            return is_hit, response.status_code
+    except httpx.HTTPError:
         return False, None
 
-def check_admissions_hit(first_name: str, last_name: str, hometown: str, state: str, debug: bool = False):
-    """Check if a name and hometown combination results in a hit."""
+async def probe_permutation(session: httpx.AsyncClient, first_name: str, last_name: str,
+                            hometown_perm: str, state: str, label: str, debug: bool = False):
+    """Probe one hometown permutation.
+
+    Returns (mp4_url or None, debug_info, definitive_miss), where definitive_miss
+    is True only when both requests completed and the MP4 returned 403/404.
+    """
     debug_info = ""
+    if debug:
+        debug_info += f"Trying permutation {label}: '{hometown_perm}'\n"
 
-    hometown_permutations = generate_hometown_permutations(hometown)
+    url = build_admissions_url(first_name, last_name, hometown_perm, state)
+
+    expected_mp4_url, expected_filename = generate_mp4_url(first_name, last_name, hometown_perm, state)
     if debug:
-        debug_info += f"Generated {len(hometown_permutations)} hometown permutations to try:\n"
-        for i, perm in enumerate(hometown_permutations, 1):
-            debug_info += f"  {i}. '{perm}'\n"
-        debug_info += "\n"
+        debug_info += f"Generated MP4 URL: {expected_mp4_url}\n"
 
-    for perm_index, hometown_perm in enumerate(hometown_permutations, 1):
+    # Run the cache check and MP4 probe side by side; a miss wastes one cheap HEAD
+    (is_cache_hit, status), (mp4_accessible, mp4_error, mp4_status) = await asyncio.gather(
+        fast_check_cache_hit(session, url, timeout=5),
+        check_mp4_accessibility(session, expected_mp4_url),
+    )
+
+    if status is None:
         if debug:
-            debug_info += f"Trying permutation {perm_index}/{len(hometown_permutations)}: '{hometown_perm}'\n"
+            debug_info += f"Request failed for '{hometown_perm}', trying next...\n\n"
+        return None, debug_info, False
 
-        encoded_hometown = quote(hometown_perm)
-        home_param = f"{encoded_hometown},{state}"
-        url = f"https://your.admissions.uiowa.edu/?first={first_name.lower()}&last={last_name.lower()}&home={home_param}"
+    definitive_miss = mp4_status in DEFINITIVE_MISS_STATUSES
 
-        try:
-            is_cache_hit, response = fast_check_cache_hit(url, timeout=5)
+    if not is_cache_hit:
+        if debug:
+            debug_info += f"Cache miss for '{hometown_perm}', ignoring MP4 check...\n\n"
+        return None, debug_info, definitive_miss
 
-            if not response:
-                if debug:
-                    debug_info += f"Request failed for '{hometown_perm}', trying next...\n\n"
-                continue
+    if mp4_accessible:
+        if debug:
+            debug_info += f"Hit found with permutation '{hometown_perm}'!\n"
+        return expected_mp4_url, debug_info, False
 
-            if not is_cache_hit:
-                if debug:
-                    debug_info += f"Cache miss for '{hometown_perm}', skipping MP4 check...\n\n"
-                continue
+    if debug:
+        debug_info += f"No hit with permutation '{hometown_perm}', trying next...\n\n"
+    return None, debug_info, definitive_miss
 
-            expected_mp4_url, expected_filename = generate_mp4_url(first_name, last_name, hometown_perm, state)
-            if debug:
-                debug_info += f"Generated MP4 URL: {expected_mp4_url}\n"
+async def check_admissions_hit(session: httpx.AsyncClient, first_name: str, last_name: str,
+                               hometown: str, state: str, debug: bool = False):
+    """Check if a name and hometown combination results in a hit."""
+    cache_key = (first_name.lower(), last_name.lower(), hometown, state.upper())
+
+    # Serve repeat lookups from the result caches; debug requests always probe
+    if not debug:
+        cached = _HIT_CACHE.get(cache_key) or _MISS_CACHE.get(cache_key)
+        if cached:
+            # The key ignores name/state casing, so echo this request's inputs
+            # rather than those of the request that filled the cache
+            hometown_shown = cached['hometown_used'] if cached['hit_found'] else (hometown or "Unknown")
+            return {
+                **cached,
+                'first_name': first_name,
+                'last_name': last_name,
+                'hometown': f"{hometown_shown}, {state}",
+                'timestamp': datetime.now().isoformat(),
+            }
+
+    result, definitive = await _check_admissions_hit(session, first_name, last_name, hometown, state, debug)
+
+    # A miss is only cached when every probe got a definitive 403/404; transport
+    # errors and timeouts must not report "not admitted" for the miss TTL
+    if result['hit_found']:
+        _HIT_CACHE[cache_key] = {**result, 'debug_info': None}
+    elif definitive:
+        _MISS_CACHE[cache_key] = {**result, 'debug_info': None}
+
+    return result
+
+async def _check_admissions_hit(session: httpx.AsyncClient, first_name: str, last_name: str,
+                                hometown: str, state: str, debug: bool = False):
+    """Probe every hometown permutation; see check_admissions_hit.
+
+    Returns (result, definitive), where definitive is False if any probe of a
+    miss failed or was inconclusive.
+    """
+    debug_info = ""
+    definitive = True
 
-            mp4_accessible, mp4_error = check_mp4_accessibility(expected_mp4_url)
+    hometown_permutations = generate_hometown_permutations(hometown)
+    if debug:
+        debug_info += f"Generated {len(hometown_permutations)} hometown permutations to try:\n"
+        for i, perm in enumerate(hometown_permutations, 1):
+            debug_info += f"  {i}. '{perm}'\n"
+        debug_info += "\n"
 
-            if mp4_accessible:
-                if debug:
-                    debug_info += f"Hit found with permutation '{hometown_perm}'!\n"
-
-                return {
-                    'first_name': first_name,
-                    'last_name': last_name,
-                    'hometown': f"{hometown_perm}, {state}",
-                    'hometown_original': hometown,
-                    'hometown_used': hometown_perm,
-                    'hit_found': True,
-                    'mp4_link': expected_mp4_url,
-                    'mp4_accessible': True,
-                    'details': f'MP4 file found and accessible (used permutation: "{hometown_perm}")',
-                    'timestamp': datetime.now().isoformat(),
-                    'debug_info': debug_info if debug else None
-                }
-            else:
-                if debug:
-                    debug_info += f"No hit with permutation '{hometown_perm}', trying next...\n\n"
+    # Permutations that map to the same portal and MP4 URLs need only one probe
+    seen_urls = set()
+    unique_permutations = []
+    for hometown_perm in hometown_permutations:
+        urls = (
+            build_admissions_url(first_name, last_name, hometown_perm, state),
+            generate_mp4_url(first_name, last_name, hometown_perm, state)[0],
+        )
+        if urls not in seen_urls:
+            seen_urls.add(urls)
+            unique_permutations.append(hometown_perm)
+
+    # Probe every permutation concurrently and take the first accessible MP4
+    tasks = {
+        asyncio.ensure_future(probe_permutation(
+            session, first_name, last_name, hometown_perm, state,
+            f"{perm_index}/{len(unique_permutations)}", debug
+        )): hometown_perm
+        for perm_index, hometown_perm in enumerate(unique_permutations, 1)
+    }
+    pending = set(tasks)
 
-        except requests.exceptions.RequestException as e:
-            if debug:
-                debug_info += f"Request exception with permutation '{hometown_perm}': {str(e)}\n"
-            continue
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                mp4_url, probe_debug, definitive_miss = task.result()
+                debug_info += probe_debug
+                definitive = definitive and definitive_miss
+
+                if mp4_url:
+                    hometown_perm = tasks[task]
+                    return {
+                        'first_name': first_name,
+                        'last_name': last_name,
+                        'hometown': f"{hometown_perm}, {state}",
+                        'hometown_original': hometown,
+                        'hometown_used': hometown_perm,
+                        'hit_found': True,
+                        'mp4_link': mp4_url,
+                        'mp4_accessible': True,
+                        'details': f'MP4 file found and accessible (used permutation: "{hometown_perm}")',
+                        'timestamp': datetime.now().isoformat(),
+                        'debug_info': debug_info if debug else None
+                    }, True
+    finally:
+        # Cancel the remaining probes once a hit is found
+        for task in pending:
+            task.cancel()
 
     if debug:
         debug_info += f"No hit found with any of the {len(hometown_permutations)} permutations tried.\n"
@@ -212,29 +367,24 @@ def check_admissions_hit(first_name: str, last_name: str, hometown: str, state:
         'details': f'MP4 file not accessible after trying {len(hometown_permutations)} permutations',
         'timestamp': datetime.now().isoformat(),
         'debug_info': debug_info if debug else None
-    }
+    }, definitive
 
-def load_iowa_counties_and_cities(csv_path="../city-county-mapping.csv"):
+def parse_counties_csv(csv_path: str):
     """Parse the Iowa cities CSV and extract counties with their cities."""
     county_cities = {}
 
-    if not os.path.exists(csv_path):
-        return {}, []
-
     try:
         with open(csv_path, 'r', encoding='utf-8') as file:
             csv_reader = csv.DictReader(file)
 
             for row in csv_reader:
-                city = row.get('City', '').strip()
-                county = row.get('County', '').strip()
+                # split/join collapses whitespace runs and strips in one step
+                city = ' '.join(row.get('City', '').split())
+                county = ' '.join(row.get('County', '').split())
 
                 if not city or not county:
                     continue
 
-                city = re.sub(r'\s+', ' ', city)
-                county = re.sub(r'\s+', ' ', county)
-
                 if county not in county_cities:
                     county_cities[county] = []
 
@@ -251,27 +401,108 @@ def load_iowa_counties_and_cities(csv_path="../city-county-mapping.csv"):
     except Exception as e:
         return {}, []
 
-def search_with_city_iteration(first_name: str, last_name: str, state: str, cities: List[str], debug: bool = False):
-    """Search for a student by iterating through a list of cities."""
+def counties_pickle_path(csv_path: str) -> str:
+    """Return the pickle cache path for a given source CSV."""
+    digest = hashlib.sha1(os.path.abspath(csv_path).encode()).hexdigest()[:12]
+    return os.path.join(COUNTIES_PICKLE_DIR, f"counties-{digest}.pkl")
+
+@functools.lru_cache(maxsize=1)
+def load_iowa_counties_and_cities(csv_path="../city-county-mapping.csv"):
+    """Load the county -> cities map, preferring the precomputed pickle.
+
+    The pickle is rebuilt from the CSV whenever it is missing or older than
+    the CSV. The result is cached for the life of the process, so callers
+    must not mutate the returned dict or lists.
+    """
+    if not os.path.exists(csv_path):
+        return {}, []
+
+    pickle_path = counties_pickle_path(csv_path)
+    try:
+        if os.path.getmtime(pickle_path) >= os.path.getmtime(csv_path):
+            with open(pickle_path, 'rb') as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return pickle.loads(mm)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        pass
+
+    result = parse_counties_csv(csv_path)
+
+    if result[1]:
+        # Every worker may rebuild at startup; write a private temp file and
+        # rename it into place so readers never map a half-written pickle
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile('wb', dir=COUNTIES_PICKLE_DIR, suffix='.tmp', delete=False) as file:
+                tmp_path = file.name
+                pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, pickle_path)
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    return result
+
+def serialize_counties(county_cities_dict: dict, counties_list: List[str]):
+    """Pre-serialize the static county responses.
+
+    Returns the /api/counties body and a dict of per-county /cities bodies.
+    """
+    counties_json = orjson.dumps({
+        "counties": [
+            {"name": county, "city_count": len(county_cities_dict[county])}
+            for county in counties_list
+        ]
+    })
+    county_cities_json = {
+        county: orjson.dumps({"cities": cities})
+        for county, cities in county_cities_dict.items()
+    }
+    return counties_json, county_cities_json
+
+async def search_with_city_iteration(session: httpx.AsyncClient, first_name: str, last_name: str,
+                                     state: str, cities: List[str], debug: bool = False):
+    """Search for a student by probing cities concurrently, stopping at the first hit."""
     debug_info = f"Searching through {len(cities)} cities for {first_name} {last_name}...\n\n"
 
-    for city_index, city in enumerate(cities, 1):
-        if debug:
-            debug_info += f"Trying city {city_index}/{len(cities)}: {city}\n"
+    # Bound how many cities are probed at once to limit load on the portal
+    semaphore = asyncio.Semaphore(CITY_SEARCH_CONCURRENCY)
 
-        result = check_admissions_hit(first_name, last_name, city, state, debug=False)
+    async def check_city(city: str):
+        async with semaphore:
+            return await check_admissions_hit(session, first_name, last_name, city, state, debug=False)
 
-        if result['hit_found']:
-            if debug:
-                debug_info += f"Found match with city: {city}\n"
-            result['debug_info'] = debug_info if debug else None
-            result['cities_tried'] = city_index
-            result['total_cities'] = len(cities)
-            result['city_found'] = city
-            return result
+    tasks = {asyncio.ensure_future(check_city(city)): city for city in cities}
+    pending = set(tasks)
+    cities_tried = 0
 
-        if debug:
-            debug_info += f"  No match with {city}\n"
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                city = tasks[task]
+                result = task.result()
+                cities_tried += 1
+
+                if result['hit_found']:
+                    if debug:
+                        debug_info += f"Found match with city: {city}\n"
+                    result['debug_info'] = debug_info if debug else None
+                    result['cities_tried'] = cities_tried
+                    result['total_cities'] = len(cities)
+                    result['city_found'] = city
+                    return result
+
+                if debug:
+                    debug_info += f"  No match with {city}\n"
+    finally:
+        # Cancel cities still queued or in flight once a hit is found
+        for task in pending:
+            task.cancel()
 
     if debug:
         debug_info += f"\nNo match found after trying {len(cities)} cities.\n"
@@ -293,34 +524,39 @@ def search_with_city_iteration(first_name: str, last_name: str, state: str, citi
         'debug_info': debug_info if debug else None
     }
 
+def json_response(content) -> Response:
+    """Serialize with orjson directly, skipping FastAPI's jsonable_encoder pass."""
+    return Response(orjson.dumps(content), media_type="application/json")
+
 @app.get("/")
 async def root():
-    return {"message": "Admissions Video Finder API"}
+    return json_response({"message": "Admissions Video Finder API"})
 
 @app.get("/api/counties")
-async def get_counties():
+async def get_counties(request: Request):
     """Get list of all counties with city counts."""
-    county_cities_dict, counties_list = load_iowa_counties_and_cities()
-    return {
-        "counties": [
-            {"name": county, "city_count": len(county_cities_dict[county])}
-            for county in counties_list
-        ]
-    }
+    return Response(
+        request.app.state.counties_json,
+        media_type="application/json",
+        headers={"Cache-Control": COUNTY_CACHE_CONTROL}
+    )
 
 @app.get("/api/counties/{county}/cities")
-async def get_cities_in_county(county: str):
+async def get_cities_in_county(county: str, request: Request):
     """Get list of cities in a specific county."""
-    county_cities_dict, _ = load_iowa_counties_and_cities()
+    cities_json = request.app.state.county_cities_json.get(county)
 
-    if county not in county_cities_dict:
+    if cities_json is None:
         raise HTTPException(status_code=404, detail="County not found")
 
-    return {"cities": county_cities_dict[county]}
+    return Response(
+        cities_json,
+        media_type="application/json",
+        headers={"Cache-Control": COUNTY_CACHE_CONTROL}
+    )
 
-@app.post("/api/search")
-async def search_video(request: SearchRequest):
-    """Search for a student's admissions video."""
+async def run_search(session: httpx.AsyncClient, county_cities_dict: dict, request: SearchRequest):
+    """Run one search request on an existing session, raising HTTPException on bad input."""
     if not request.first_name or not request.last_name or not request.state:
         raise HTTPException(status_code=400, detail="First name, last name, and state are required")
 
@@ -329,13 +565,13 @@ async def search_video(request: SearchRequest):
         if request.state.upper() != "IA":
             raise HTTPException(status_code=400, detail="County search currently only supports Iowa (IA)")
 
-        county_cities_dict, _ = load_iowa_counties_and_cities()
         cities_in_county = county_cities_dict.get(request.county, [])
 
         if not cities_in_county:
             raise HTTPException(status_code=404, detail=f"No cities found for {request.county} County")
 
-        result = search_with_city_iteration(
+        result = await search_with_city_iteration(
+            session,
             request.first_name,
             request.last_name,
             request.state,
@@ -347,18 +583,70 @@ async def search_video(request: SearchRequest):
 
     # Direct hometown search
     elif request.hometown:
-        result = check_admissions_hit(
+        return await check_admissions_hit(
+            session,
             request.first_name,
             request.last_name,
             request.hometown,
             request.state,
             debug=request.show_debug
         )
-        return result
 
     else:
         raise HTTPException(status_code=400, detail="Either hometown or county must be provided")
 
+@app.post("/api/search")
+async def search_video(request: SearchRequest, http_request: Request):
+    """Search for a student's admissions video."""
+    state = http_request.app.state
+    county_cities_dict, _ = state.counties
+    return json_response(await run_search(state.client, county_cities_dict, request))
+
+@app.post("/api/search_batch")
+async def search_video_batch(search_requests: List[SearchRequest], http_request: Request):
+    """Search for several students at once over the shared HTTP client.
+
+    Results are returned in request order; an invalid entry yields an
+    ``error`` object in its slot instead of failing the whole batch.
+    Batches larger than MAX_BATCH_SIZE are rejected with 413.
+    """
+    # Each entry can fan out to every city x permutation in a county, so cap the batch
+    if len(search_requests) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: at most {MAX_BATCH_SIZE} searches per request"
+        )
+
+    state = http_request.app.state
+    county_cities_dict, _ = state.counties
+    results = await asyncio.gather(
+        *(run_search(state.client, county_cities_dict, request) for request in search_requests),
+        return_exceptions=True
+    )
+
+    batch = []
+    for request, result in zip(search_requests, results):
+        if isinstance(result, HTTPException):
+            batch.append({
+                'first_name': request.first_name,
+                'last_name': request.last_name,
+                'error': {'status_code': result.status_code, 'detail': result.detail}
+            })
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            batch.append(result)
+
+    return json_response(batch)
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers require the import string; "auto" picks uvloop/httptools when installed
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop="auto",
+        http="auto",
+    )
@@ -1,96 +1,233 @@
 import requests
-from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import quote_from_bytes
 import re
+import string
 import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 import csv
+import collections
+import json
+import shelve
+import shutil
+import gzip
 import os
 from datetime import datetime
 import argparse
+import logging
+import functools
+import asyncio
 
-def debug_http_request(method, url, params=None, headers=None):
-    """Print HTTP request details for debugging"""
-    print(f"🔧 [HTTP DEBUG] Making {method} request:")
-    print(f"   URL: {url}")
-    if params:
-        print(f"   Parameters: {params}")
-    if headers:
-        print(f"   Headers: {headers}")
-
-def debug_http_response(response):
-    """Print HTTP response details for debugging"""
-    print(f"🔧 [HTTP DEBUG] Response received:")
-    print(f"   Status Code: {response.status_code}")
-    print(f"   Response URL: {response.url}")
-    print(f"   Headers: {dict(response.headers)}")
+try:
+    import httpx  # type: ignore
+    import h2  # type: ignore  # noqa: F401 (required for httpx http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
+try:
+    import aiofiles  # type: ignore
+    AIOFILES_AVAILABLE = True
+except ImportError:
+    AIOFILES_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Concurrent MP4 downloads on the async bulk path, kept apart from the probe workers
+DOWNLOAD_CONCURRENCY = 8
+
+# Read/write size for MP4 downloads on the async path
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Buffer size for copying a blocking download to disk
+DOWNLOAD_COPY_BUFFER = 1024 * 1024
+
+# On-disk cache of MP4 URLs that returned a definitive miss, so reruns skip them
+MISS_CACHE_PATH = ".mp4_cache.db"
+MISS_CACHE_TTL = 7 * 24 * 3600
+MISS_CACHE_STATUSES = {403, 404}
+
+# shelve is not thread-safe; the threaded bulk path shares one cache
+_MISS_CACHE_LOCK = threading.Lock()
+
+# Column order of the bulk results CSV
+RESULT_FIELDNAMES = [
+    'first_name', 'last_name', 'hometown', 'status_code', 
+    'hit_found', 'mp4_link', 'mp4_accessible', 'downloaded',
+    'download_path', 'details', 'timestamp'
+]
+
+# Result rows buffered before each batched write (and flush) of the results file
+OUTPUT_BATCH_SIZE = 256
+
+# CSV header patterns in priority order; a bare "name" header is only used
+# as the first name when no header mentions "first"
+_COLUMN_PATTERNS = (
+    ('first', re.compile(r'first')),
+    ('last', re.compile(r'last|surname')),
+    ('name', re.compile(r'name')),
+    ('hometown', re.compile(r'home|city|town')),
+    ('state', re.compile(r'state')),
+)
+
+# URL templates for the two fixed hosts, bound once
+_ADMISSIONS_URL_TMPL = "https://your.admissions.uiowa.edu/?first={}&last={}&home={},{}".format
+_MP4_SLUG_TMPL = "{}-{}-{}-{}".format
+_MP4_URL_TMPL = "https://d3mqiwdgu1iop6.cloudfront.net/videos/{}.mp4".format
+
+# Last formatted second for current_timestamp(): (epoch second, ISO string).
+# Replaced as a whole tuple so threads never see a half-updated pair
+_TIMESTAMP_CACHE = (None, '')
+
+# MP4 filename cleanup: spaces become dashes, commas are dropped. The ASCII
+# table also lowercases, so ASCII slugs need only one translate pass
+_MP4_TRANS = str.maketrans({' ': '-', ',': None})
+_MP4_ASCII_TRANS = str.maketrans({
+    **{c: c.lower() for c in string.ascii_uppercase},
+    ' ': '-',
+    ',': None
+})
+
+# Maximum concurrent records in flight for the async bulk path
+BULK_CONCURRENCY = 32
+
+# Default sustained request rate (requests/second) for bulk validation
+BULK_RATE_LIMIT = 10
+
+# Statuses worth retrying with backoff, and how many attempts to make
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 5
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: bursts of up to `capacity` requests, `rate`
+    requests per second sustained. Callers reserve a token and wait out any
+    deficit, so concurrent waiters are spaced evenly.
+    """
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _reserve(self):
+        """Take a token and return how many seconds the caller must wait for it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0 if self.tokens >= 0 else -self.tokens / self.rate
+    
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+    
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+# Shared session so every row reuses keep-alive connections to the
+# admissions portal and CloudFront instead of a new TLS handshake per request
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+def current_timestamp():
+    """
+    Local ISO-8601 timestamp with microseconds, like datetime.now().isoformat(),
+    but the date/time part is only formatted once per second.
+    """
+    global _TIMESTAMP_CACHE
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _TIMESTAMP_CACHE
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second).isoformat()
+        _TIMESTAMP_CACHE = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}"
+
+@functools.lru_cache(maxsize=4096)
 def generate_mp4_url(first_name, last_name, hometown, state):
     """
     Generate the expected MP4 URL based on the observed naming pattern.
     Pattern: https://d3mqiwdgu1iop6.cloudfront.net/videos/first-last-hometown-state.mp4
     """
-    # Clean and format the components for the filename
-    first_clean = first_name.lower().replace(' ', '-')
-    last_clean = last_name.lower().replace(' ', '-')
-    hometown_clean = hometown.lower().replace(' ', '-').replace(',', '')
-    state_clean = state.lower()
-    
-    # Generate the filename and URL
-    filename = f"{first_clean}-{last_clean}-{hometown_clean}-{state_clean}.mp4"
-    mp4_url = f"https://d3mqiwdgu1iop6.cloudfront.net/videos/{filename}"
+    # Clean every component in a single translate pass; non-ASCII names
+    # keep str.lower() for full Unicode case folding
+    slug = _MP4_SLUG_TMPL(first_name, last_name, hometown, state)
+    if slug.isascii():
+        slug = slug.translate(_MP4_ASCII_TRANS)
+    else:
+        slug = slug.lower().translate(_MP4_TRANS)
+    mp4_url = _MP4_URL_TMPL(slug)
     
-    print(f"🔧 [DEBUG] Generated MP4 URL: {mp4_url}")
+    logger.debug("Generated MP4 URL: %s", mp4_url)
     return mp4_url
 
-def check_admissions_hit(first_name, last_name, hometown, state):
+@functools.lru_cache(maxsize=4096)
+def build_admissions_url(first_name, last_name, hometown, state):
+    """
+    Build the admissions portal URL in the exact format that works
+    (spaces in the hometown are encoded as %20, the state follows a bare comma).
+    """
+    home_q = quote_from_bytes(hometown.encode('utf-8'))
+    return _ADMISSIONS_URL_TMPL(first_name.lower(), last_name.lower(), home_q, state)
+
+def check_admissions_hit(first_name, last_name, hometown, state, miss_cache=None):
     """
     Check if a name and hometown combination results in a hit
     on the University of Iowa admissions portal and extract the MP4 link.
     
+    The portal page itself is never parsed, so only the MP4 is probed; the
+    portal URL is reported in 'url_used' and 'status_code' is the MP4 probe's.
+    
     Args:
         first_name (str): First name
         last_name (str): Last name  
         hometown (str): Hometown/city
         state (str): State abbreviation (e.g., 'IA', 'IL')
+        miss_cache (shelve.Shelf, optional): Persistent cache of known-missing MP4 URLs
     
     Returns:
         dict: Results including status code, hit status, MP4 link, and details
     """
     
-    # Build the URL manually to match the exact format that works
-    encoded_hometown = quote(hometown)  # This encodes spaces as %20
-    home_param = f"{encoded_hometown},{state}"
-    
-    # Build the complete URL manually
-    url = f"https://your.admissions.uiowa.edu/?first={first_name.lower()}&last={last_name.lower()}&home={home_param}"
+    url = build_admissions_url(first_name, last_name, hometown, state)
     
     try:
-        # Debug: Print the request being made
-        debug_http_request("GET", url)
-        
-        # Make the GET request with a timeout - use the manually built URL without params
-        response = requests.get(url, timeout=10)
-        
-        # Debug: Print the response details
-        debug_http_response(response)
-        
         # Generate the expected MP4 URL based on naming pattern
         expected_mp4_url = generate_mp4_url(first_name, last_name, hometown, state)
         
         # Check if the generated MP4 URL is accessible
-        mp4_accessible = check_mp4_accessibility(expected_mp4_url)
+        cached_status = lookup_miss(miss_cache, expected_mp4_url)
+        if cached_status is not None:
+            mp4_accessible, status_code = False, cached_status
+        else:
+            mp4_accessible, status_code = check_mp4_status(expected_mp4_url)
+            remember_probe(miss_cache, expected_mp4_url, mp4_accessible, status_code)
         
         # Analyze the response
         result = {
             'first_name': first_name,
             'last_name': last_name,
             'hometown': f"{hometown}, {state}",
-            'url_used': response.url,
-            'status_code': response.status_code,
+            'url_used': url,
+            'status_code': status_code,
             'hit_found': mp4_accessible,  # Hit found if MP4 is accessible
             'mp4_link': expected_mp4_url if mp4_accessible else None,
             'mp4_accessible': mp4_accessible,
             'details': '',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': current_timestamp()
         }
         
         # Set details based on MP4 accessibility
@@ -102,7 +239,7 @@ def check_admissions_hit(first_name, last_name, hometown, state):
         return result
         
     except requests.exceptions.RequestException as e:
-        print(f"🔧 [HTTP DEBUG] Request exception: {str(e)}")
+        logger.debug("Request exception: %s", e)
         return {
             'first_name': first_name,
             'last_name': last_name, 
@@ -112,41 +249,120 @@ def check_admissions_hit(first_name, last_name, hometown, state):
             'mp4_link': None,
             'mp4_accessible': False,
             'details': f'Request failed: {str(e)}',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': current_timestamp()
         }
 
-def check_mp4_accessibility(mp4_url):
+def lookup_miss(miss_cache, mp4_url):
     """
-    Check if the MP4 file is accessible and downloadable.
+    Return the cached status of a recent known miss for mp4_url, or None.
     """
-    print(f"🔧 [DEBUG] Checking MP4 accessibility: {mp4_url}")
-    try:
-        # Make a HEAD request to check accessibility without downloading the entire file
-        debug_http_request("HEAD", mp4_url)
-        response = requests.head(mp4_url, timeout=10, allow_redirects=True)
-        debug_http_response(response)
-        
-        # Check if the request was successful and content type is video/mp4
-        if response.status_code == 200:
-            content_type = response.headers.get('content-type', '').lower()
-            print(f"🔧 [DEBUG] Content-Type: {content_type}")
-            if 'video/mp4' in content_type or 'application/octet-stream' in content_type:
-                print("🔧 [DEBUG] MP4 is accessible via HEAD request")
-                return True
-        
-        # If HEAD request fails or gives unexpected response, try a GET with range
-        headers = {'Range': 'bytes=0-1'}  # Just request first 2 bytes to check accessibility
-        debug_http_request("GET", mp4_url, headers=headers)
-        response = requests.get(mp4_url, headers=headers, timeout=10, stream=True)
-        debug_http_response(response)
+    if miss_cache is None:
+        return None
+    with _MISS_CACHE_LOCK:
+        entry = miss_cache.get(mp4_url)
+    if entry and time.time() - entry[1] < MISS_CACHE_TTL:
+        return entry[0]
+    return None
+
+def remember_probe(miss_cache, mp4_url, accessible, status_code):
+    """
+    Record a definitive miss in the cache, or forget the URL once it is accessible.
+    """
+    if miss_cache is None:
+        return
+    with _MISS_CACHE_LOCK:
+        if not accessible and status_code in MISS_CACHE_STATUSES:
+            miss_cache[mp4_url] = (status_code, time.time())
+        elif accessible and mp4_url in miss_cache:
+            del miss_cache[mp4_url]
+
+def check_mp4_status(mp4_url):
+    """
+    Probe the MP4 with a single 1-byte range GET.
+    Returns (accessible, status_code); request errors propagate to the caller.
+    """
+    headers = {'Range': 'bytes=0-0'}
+    logger.debug("GET %s headers=%s", mp4_url, headers)
+    with SESSION.get(mp4_url, headers=headers, timeout=10, stream=True, allow_redirects=True) as response:
+        logger.debug("%s %s headers=%s", response.status_code, response.url, response.headers)
+        # Drain the (1-byte or error) body so urllib3 returns the connection to
+        # the pool; a 200 means the Range was ignored, so don't pull the whole file
+        if response.status_code != 200:
+            response.content
+    
+    accessible = response.status_code in [200, 206]
+    logger.debug("MP4 accessible via range request: %s", accessible)
+    return accessible, response.status_code
+
+async def fetch_with_retry(client, bucket, method, url, **kwargs):
+    """
+    Issue a rate-limited request, retrying 429/5xx responses with exponential
+    backoff (or the server's Retry-After). Returns (status, headers, final_url).
+    Bodies other than a full 200 are small (range or error responses) and are
+    drained so the connection is reused; a 200 body is left unread.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        await bucket.acquire_async()
+        async with client.stream(method, url, **kwargs) as response:
+            if response.status_code != 200:
+                await response.aread()
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS - 1:
+                return response.status_code, response.headers, str(response.url)
+            retry_after = response.headers.get('Retry-After')
         
-        accessible = response.status_code in [200, 206]
-        print(f"🔧 [DEBUG] MP4 accessible via range request: {accessible}")
-        return accessible
+        try:
+            wait = float(retry_after)
+        except (TypeError, ValueError):
+            wait = 2 ** attempt
+        await asyncio.sleep(wait)
+
+async def check_mp4_status_async(client, bucket, mp4_url):
+    """
+    Async variant of check_mp4_status for the bulk path.
+    """
+    status, _, _ = await fetch_with_retry(client, bucket, 'GET', mp4_url, headers={'Range': 'bytes=0-0'})
+    return status in [200, 206], status
+
+async def check_admissions_hit_async(client, bucket, first_name, last_name, hometown, state, miss_cache=None):
+    """
+    Async variant of check_admissions_hit for the bulk path; returns the same result dict.
+    """
+    url = build_admissions_url(first_name, last_name, hometown, state)
+    
+    try:
+        expected_mp4_url = generate_mp4_url(first_name, last_name, hometown, state)
+        cached_status = lookup_miss(miss_cache, expected_mp4_url)
+        if cached_status is not None:
+            mp4_accessible, status_code = False, cached_status
+        else:
+            mp4_accessible, status_code = await check_mp4_status_async(client, bucket, expected_mp4_url)
+            remember_probe(miss_cache, expected_mp4_url, mp4_accessible, status_code)
         
-    except requests.exceptions.RequestException as e:
-        print(f"🔧 [DEBUG] MP4 accessibility check failed: {str(e)}")
-        return False
+        return {
+            'first_name': first_name,
+            'last_name': last_name,
+            'hometown': f"{hometown}, {state}",
+            'url_used': url,
+            'status_code': status_code,
+            'hit_found': mp4_accessible,
+            'mp4_link': expected_mp4_url if mp4_accessible else None,
+            'mp4_accessible': mp4_accessible,
+            'details': 'MP4 file found and accessible' if mp4_accessible else 'MP4 file not accessible (may not exist)',
+            'timestamp': current_timestamp()
+        }
+    
+    except httpx.HTTPError as e:
+        return {
+            'first_name': first_name,
+            'last_name': last_name,
+            'hometown': f"{hometown}, {state}",
+            'status_code': None,
+            'hit_found': False,
+            'mp4_link': None,
+            'mp4_accessible': False,
+            'details': f'Request failed: {str(e)}',
+            'timestamp': current_timestamp()
+        }
 
 def download_mp4(mp4_url, filename=None, download_dir="downloads"):
     """
@@ -161,152 +377,442 @@ def download_mp4(mp4_url, filename=None, download_dir="downloads"):
     
     filepath = os.path.join(download_dir, filename)
     
-    print(f"🔧 [DEBUG] Starting MP4 download: {mp4_url} -> {filepath}")
+    logger.debug("Starting MP4 download: %s -> %s", mp4_url, filepath)
     
     try:
-        debug_http_request("GET", mp4_url)
-        response = requests.get(mp4_url, stream=True, timeout=30)
-        debug_http_response(response)
-        
-        if response.status_code == 200:
+        logger.debug("GET %s", mp4_url)
+        with SESSION.get(mp4_url, stream=True, timeout=30) as response:
+            logger.debug("%s %s headers=%s", response.status_code, response.url, response.headers)
+            
+            if response.status_code != 200:
+                logger.debug("Download failed with status: %s", response.status_code)
+                return False, f"Failed to download: HTTP {response.status_code}"
+            
             total_size = int(response.headers.get('content-length', 0))
-            print(f"🔧 [DEBUG] Download size: {total_size} bytes")
+            logger.debug("Download size: %d bytes", total_size)
             
+            # Copy straight from the raw stream in large blocks rather than a
+            # per-chunk Python loop; the socket may be TLS, so sendfile() can't apply
+            response.raw.decode_content = True
             with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            print(f"🔧 [DEBUG] Download completed: {filepath}")
-            return True, filepath
-        else:
-            print(f"🔧 [DEBUG] Download failed with status: {response.status_code}")
-            return False, f"Failed to download: HTTP {response.status_code}"
+                # Reserve the full size up front so the file is laid out contiguously;
+                # Content-Length is the encoded size, so only trust it for identity bodies
+                if total_size and hasattr(os, 'posix_fallocate') and not response.headers.get('content-encoding'):
+                    try:
+                        os.posix_fallocate(f.fileno(), 0, total_size)
+                    except OSError as e:
+                        logger.debug("Preallocation skipped: %s", e)
+                shutil.copyfileobj(response.raw, f, DOWNLOAD_COPY_BUFFER)
+                # Drop any preallocated tail left by a short body
+                f.truncate()
+        
+        logger.debug("Download completed: %s", filepath)
+        return True, filepath
     except Exception as e:
-        print(f"🔧 [DEBUG] Download error: {str(e)}")
+        logger.debug("Download error: %s", e)
         return False, f"Download error: {str(e)}"
 
 # ... (rest of the functions remain similar but updated to use the new approach)
 
-def process_csv_bulk_validation(csv_file_path, output_file=None, download_videos=False, delay=2):
+def attach_download(result, download_videos, download_dir):
     """
-    Process a CSV file for bulk validation of name/hometown combinations.
+    Download the MP4 for a result if requested and accessible, recording the outcome on the result.
     """
-    # Validate CSV file exists
-    if not os.path.exists(csv_file_path):
-        print(f"❌ Error: CSV file '{csv_file_path}' not found.")
-        return []
+    if download_videos and result['mp4_accessible'] and result['mp4_link']:
+        filename = result['mp4_link'].split('/')[-1]
+        success, download_path = download_mp4(result['mp4_link'], filename, download_dir)
+        result['downloaded'] = success
+        result['download_path'] = download_path if success else ''
+    else:
+        result['downloaded'] = False
+        result['download_path'] = ''
+
+async def download_mp4_async(client, mp4_url, filename=None, download_dir="downloads"):
+    """
+    Async variant of download_mp4 for the bulk path; writes through aiofiles when available.
+    """
+    os.makedirs(download_dir, exist_ok=True)
+    
+    if not filename:
+        filename = mp4_url.split('/')[-1] or f"video_{int(time.time())}.mp4"
+    
+    filepath = os.path.join(download_dir, filename)
     
-    # Read CSV file
-    records = []
     try:
-        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
+        # httpx timeouts are per operation (connect, each read/write, pool wait), not
+        # for the whole transfer; 30s matches download_mp4 and tolerates slower
+        # chunk reads than the client's 10s probe default
+        async with client.stream('GET', mp4_url, timeout=30.0) as response:
+            if response.status_code != 200:
+                return False, f"Failed to download: HTTP {response.status_code}"
             
-            # Map common column names
-            fieldnames = [f.lower() for f in reader.fieldnames]
-            first_name_col = None
-            last_name_col = None
-            hometown_col = None
-            state_col = None
-            
-            # Find appropriate columns
-            for field in reader.fieldnames:
-                lower_field = field.lower()
-                if 'first' in lower_field or 'name' in lower_field and 'last' not in lower_field:
-                    first_name_col = field
-                elif 'last' in lower_field:
-                    last_name_col = field
-                elif 'home' in lower_field or 'city' in lower_field or 'town' in lower_field:
-                    hometown_col = field
-                elif 'state' in lower_field:
-                    state_col = field
-            
-            if not first_name_col or not last_name_col:
-                print("❌ Error: CSV must contain first name and last name columns.")
-                return []
-            
-            for row in reader:
-                records.append({
-                    'first_name': row[first_name_col].strip(),
-                    'last_name': row[last_name_col].strip(),
-                    'hometown': row.get(hometown_col, '').strip() if hometown_col else '',
-                    'state': row.get(state_col, 'IA').strip().upper() if state_col else 'IA'
-                })
-                
-    except Exception as e:
-        print(f"❌ Error reading CSV file: {e}")
-        return []
+            if AIOFILES_AVAILABLE:
+                async with aiofiles.open(filepath, 'wb') as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
+            else:
+                with open(filepath, 'wb') as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(f.write, chunk)
+        
+        return True, filepath
+    except (httpx.HTTPError, OSError) as e:
+        return False, f"Download error: {str(e)}"
+
+def record_key(record):
+    """
+    Key identifying records that produce the same URLs (and so the same result).
+    """
+    return (
+        record['first_name'].lower(),
+        record['last_name'].lower(),
+        record['hometown'].lower(),
+        record['state'].upper()
+    )
+
+def result_for_record(result, record):
+    """
+    Copy a shared result, relabelled with a duplicate record's own name, hometown
+    and portal URL.
+    """
+    return {
+        **result,
+        'first_name': record['first_name'],
+        'last_name': record['last_name'],
+        'hometown': f"{record['hometown']}, {record['state']}",
+        'url_used': build_admissions_url(record['first_name'], record['last_name'],
+                                         record['hometown'], record['state'])
+    }
+
+async def validate_records_async(records, on_result, download_videos=False, download_dir="bulk_downloads", rate=BULK_RATE_LIMIT, miss_cache=None):
+    """
+    Check records from an iterable on one HTTP/2 httpx client, so concurrent probes
+    share multiplexed connections instead of one socket each. A producer feeds a bounded
+    queue consumed by BULK_CONCURRENCY workers, so only O(concurrency) records are held
+    in memory; `rate` caps requests per second overall. Downloads run as separate tasks
+    limited to DOWNLOAD_CONCURRENCY so they don't hold up probes. Duplicate records
+    (see record_key) share one probe and one download. Each result is passed to
+    on_result(record, result) in completion order.
+    """
+    queue = asyncio.Queue(maxsize=2 * BULK_CONCURRENCY)
+    bucket = TokenBucket(rate)
+    download_semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+    downloads = set()
+    probes = {}
+    fetches = {}
+    limits = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    completed = 0
+    
+    def finish(record, result):
+        nonlocal completed
+        on_result(record, result)
+        
+        completed += 1
+        status_icon = '✅' if result['hit_found'] else '❌'
+        print(f"🔍 {completed} {record['first_name']} {record['last_name']}: {status_icon} {result['details']}")
     
-    print(f"📊 Processing {len(records)} records from '{csv_file_path}'")
-    print("⏳ This may take a while...")
+    async def fetch(mp4_link):
+        async with download_semaphore:
+            return await download_mp4_async(client, mp4_link, mp4_link.split('/')[-1], download_dir)
     
-    results = []
-    download_dir = "bulk_downloads"
+    async def download_then_finish(record, result):
+        mp4_link = result['mp4_link']
+        if mp4_link not in fetches:
+            fetches[mp4_link] = asyncio.ensure_future(fetch(mp4_link))
+        success, download_path = await fetches[mp4_link]
+        result['downloaded'] = success
+        result['download_path'] = download_path if success else ''
+        finish(record, result)
     
-    for i, record in enumerate(records, 1):
-        print(f"🔍 Processing {i}/{len(records)}: {record['first_name']} {record['last_name']}...")
-        
+    async def producer():
+        for record in records:
+            await queue.put(record)
+        # One sentinel per worker signals the end of the input
+        for _ in range(BULK_CONCURRENCY):
+            await queue.put(None)
+    
+    async def worker():
+        while True:
+            record = await queue.get()
+            if record is None:
+                return
+            key = record_key(record)
+            if key not in probes:
+                probes[key] = asyncio.ensure_future(check_admissions_hit_async(
+                    client,
+                    bucket,
+                    record['first_name'],
+                    record['last_name'],
+                    record['hometown'],
+                    record['state'],
+                    miss_cache
+                ))
+            result = result_for_record(await probes[key], record)
+            
+            if download_videos and result['mp4_accessible'] and result['mp4_link']:
+                task = asyncio.ensure_future(download_then_finish(record, result))
+                downloads.add(task)
+                task.add_done_callback(downloads.discard)
+            else:
+                result['downloaded'] = False
+                result['download_path'] = ''
+                finish(record, result)
+    
+    async with httpx.AsyncClient(http2=True, limits=limits, timeout=10.0, follow_redirects=True) as client:
+        await asyncio.gather(producer(), *(worker() for _ in range(BULK_CONCURRENCY)))
+        if downloads:
+            await asyncio.gather(*downloads)
+
+def validate_records_threaded(records, on_result, download_videos=False, download_dir="bulk_downloads", rate=BULK_RATE_LIMIT, miss_cache=None):
+    """
+    Fallback for validate_records_async when httpx/h2 is unavailable: checks records
+    on BULK_CONCURRENCY threads sharing SESSION (requests releases the GIL during
+    socket I/O). At most 2*BULK_CONCURRENCY records wait on results at a time, and
+    duplicate records share one check. Each result is passed to on_result(record,
+    result) on the calling thread in completion order.
+    """
+    # SESSION's Retry handles 429/5xx backoff; the bucket paces records
+    bucket = TokenBucket(rate)
+    probes = {}
+    waiting = {}
+    completed = 0
+    
+    def resolve(record):
+        # Known misses are answered from the cache, so they don't wait for a token
+        mp4_url = generate_mp4_url(record['first_name'], record['last_name'], record['hometown'], record['state'])
+        if lookup_miss(miss_cache, mp4_url) is None:
+            bucket.acquire()
         result = check_admissions_hit(
             record['first_name'], 
             record['last_name'], 
             record['hometown'], 
-            record['state']
+            record['state'],
+            miss_cache
         )
+        attach_download(result, download_videos, download_dir)
+        return result
+    
+    def finish(future):
+        nonlocal completed
+        for record in waiting.pop(future):
+            result = result_for_record(future.result(), record)
+            on_result(record, result)
+            
+            completed += 1
+            status_icon = '✅' if result['hit_found'] else '❌'
+            print(f"🔍 {completed} {record['first_name']} {record['last_name']}: {status_icon} {result['details']}")
+    
+    with ThreadPoolExecutor(max_workers=BULK_CONCURRENCY) as executor:
+        for record in records:
+            key = record_key(record)
+            if key not in probes:
+                probes[key] = executor.submit(resolve, record)
+            waiting.setdefault(probes[key], []).append(record)
+            
+            while len(waiting) >= 2 * BULK_CONCURRENCY:
+                done, _ = wait(waiting, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
         
-        # Download MP4 if requested and accessible
-        if download_videos and result['mp4_accessible'] and result['mp4_link']:
-            filename = result['mp4_link'].split('/')[-1]
-            success, download_path = download_mp4(result['mp4_link'], filename, download_dir)
-            result['downloaded'] = success
-            result['download_path'] = download_path if success else ''
-        else:
-            result['downloaded'] = False
-            result['download_path'] = ''
-        
-        results.append(result)
-        
-        # Progress update
-        status_icon = '✅' if result['hit_found'] else '❌'
-        print(f"   {status_icon} {result['details']}")
-        
-        # Respectful delay
-        if i < len(records):
-            time.sleep(delay)
+        for future in as_completed(list(waiting)):
+            finish(future)
+
+def detect_columns(fieldnames):
+    """
+    Map CSV headers to (first_name, last_name, hometown, state) columns; missing ones are None.
+    Each header takes the first role it matches and the first header for a role wins.
+    """
+    columns = {}
     
-    # Generate output filename if not provided
-    if not output_file:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = f"bulk_validation_results_{timestamp}.csv"
+    for field in fieldnames:
+        lower_field = field.lower()
+        for role, pattern in _COLUMN_PATTERNS:
+            if pattern.search(lower_field):
+                columns.setdefault(role, field)
+                break
+    
+    first_name_col = columns.get('first') or columns.get('name')
+    return first_name_col, columns.get('last'), columns.get('hometown'), columns.get('state')
+
+def iter_records(reader, first_name_col, last_name_col, hometown_col, state_col):
+    """
+    Lazily yield normalized records from a DictReader, one row at a time.
+    """
+    for row in reader:
+        yield {
+            'first_name': row[first_name_col].strip(),
+            'last_name': row[last_name_col].strip(),
+            'hometown': row.get(hometown_col, '').strip() if hometown_col else '',
+            'state': row.get(state_col, 'IA').strip().upper() if state_col else 'IA'
+        }
+
+def skip_resumed(records, resumed):
+    """
+    Drop records already covered by a checkpoint, one per recorded occurrence of each key.
+    """
+    for record in records:
+        key = record_key(record)
+        if resumed[key] > 0:
+            resumed[key] -= 1
+            continue
+        yield record
+
+def input_fingerprint(csv_file_path):
+    """
+    Identify an input CSV by path, size and mtime, so a checkpoint is only reused for the same file.
+    """
+    st = os.stat(csv_file_path)
+    return {'path': os.path.abspath(csv_file_path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+def checkpoint_matches(checkpoint_path, fingerprint):
+    """
+    Return True if the checkpoint exists and its header was written for this input fingerprint.
+    """
+    try:
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return False
+    return isinstance(header, dict) and header.get('checkpoint_for') == fingerprint
+
+def iter_checkpoint(checkpoint_path):
+    """
+    Yield (record_key, result) pairs from a JSONL checkpoint, skipping the header
+    and a line torn by an interrupted write.
+    """
+    with open(checkpoint_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if 'record_key' in result:
+                yield tuple(result.pop('record_key')), result
+
+def open_checkpoint(checkpoint_path, fingerprint, resume):
+    """
+    Open the JSONL checkpoint for line-buffered appends. When resuming, a torn final
+    line is terminated first; otherwise the file is started over with a header
+    identifying the input.
+    """
+    if not resume:
+        checkpoint = open(checkpoint_path, 'w', encoding='utf-8', buffering=1)
+        checkpoint.write(json.dumps({'checkpoint_for': fingerprint}) + '\n')
+        return checkpoint
+    
+    checkpoint = open(checkpoint_path, 'a', encoding='utf-8', buffering=1)
+    with open(checkpoint_path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            checkpoint.write('\n')
+    return checkpoint
+
+def process_csv_bulk_validation(csv_file_path, output_file=None, download_videos=False, rate=BULK_RATE_LIMIT, gzip_output=False):
+    """
+    Process a CSV file for bulk validation of name/hometown combinations.
+    Rows are streamed from the file and each result is written as soon as it
+    completes (gzip-compressed if gzip_output); beyond summary counters, only one
+    result per unique record is kept so duplicate rows are not re-requested.
+    Every result is also appended to a `<output_file>.jsonl` checkpoint that is
+    removed once the run completes. If a run is interrupted, rerunning with the
+    same input and output file replays it and only processes the remaining rows.
+    Returns the summary dict, or None if the input could not be used.
+    """
+    # Validate CSV file exists
+    if not os.path.exists(csv_file_path):
+        print(f"❌ Error: CSV file '{csv_file_path}' not found.")
+        return None
+    
+    download_dir = "bulk_downloads"
+    summary = {'total': 0, 'hits': 0, 'accessible': 0, 'downloaded': 0}
     
-    # Write results to CSV
     try:
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
-                'first_name', 'last_name', 'hometown', 'status_code', 
-                'hit_found', 'mp4_link', 'mp4_accessible', 'downloaded',
-                'download_path', 'details', 'timestamp'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for result in results:
-                writer.writerow({k: result.get(k, '') for k in fieldnames})
+        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
+            reader = csv.DictReader(csvfile)
+            columns = detect_columns(reader.fieldnames or [])
+            
+            if not columns[0] or not columns[1]:
+                print("❌ Error: CSV must contain first name and last name columns.")
+                return None
+            
+            # Generate output filename if not provided
+            if not output_file:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                output_file = f"bulk_validation_results_{timestamp}.csv"
+            checkpoint_path = f"{output_file}.jsonl"
+            fingerprint = input_fingerprint(csv_file_path)
+            resume = checkpoint_matches(checkpoint_path, fingerprint)
+            if not resume and os.path.exists(checkpoint_path):
+                print(f"⚠️ Ignoring checkpoint '{checkpoint_path}': it was written for a different input file")
+            if gzip_output:
+                if not output_file.endswith('.gz'):
+                    output_file += '.gz'
+                outfile = gzip.open(output_file, 'wt', newline='', encoding='utf-8', compresslevel=6)
+            else:
+                outfile = open(output_file, 'w', newline='', encoding='utf-8')
+            
+            with outfile, shelve.open(MISS_CACHE_PATH) as miss_cache, open_checkpoint(checkpoint_path, fingerprint, resume) as checkpoint:
+                writer = csv.writer(outfile)
+                writer.writerow(RESULT_FIELDNAMES)
+                batch = []
+                
+                def write_batch():
+                    writer.writerows(batch)
+                    batch.clear()
+                    # Flush so partial results survive an interrupted run
+                    outfile.flush()
+                
+                def emit_result(result):
+                    batch.append(tuple([result.get(k, '') for k in RESULT_FIELDNAMES]))
+                    summary['total'] += 1
+                    summary['hits'] += bool(result['hit_found'])
+                    summary['accessible'] += bool(result['mp4_accessible'])
+                    summary['downloaded'] += bool(result.get('downloaded', False))
+                    if len(batch) >= OUTPUT_BATCH_SIZE:
+                        write_batch()
+                
+                def record_result(record, result):
+                    # The checkpoint is line-buffered, so each result is on disk once recorded
+                    checkpoint.write(json.dumps({**result, 'record_key': record_key(record)}) + '\n')
+                    emit_result(result)
+                
+                try:
+                    # Replay an earlier run's results and skip as many matching rows
+                    resumed = collections.Counter()
+                    if resume:
+                        for key, result in iter_checkpoint(checkpoint_path):
+                            resumed[key] += 1
+                            emit_result(result)
+                        print(f"♻️ Resuming: {summary['total']} results loaded from '{checkpoint_path}'")
+                    
+                    records = skip_resumed(iter_records(reader, *columns), resumed)
+                    print(f"📊 Processing records from '{csv_file_path}'")
+                    print("⏳ This may take a while...")
+                    
+                    if HTTP2_AVAILABLE:
+                        asyncio.run(validate_records_async(records, record_result, download_videos, download_dir, rate, miss_cache))
+                    else:
+                        validate_records_threaded(records, record_result, download_videos, download_dir, rate, miss_cache)
+                finally:
+                    write_batch()
         
+        # The run finished, so the checkpoint must not be replayed by a later run
+        os.remove(checkpoint_path)
         print(f"💾 Results saved to: {output_file}")
         
-        # Summary statistics
-        hits = sum(1 for r in results if r['hit_found'])
-        accessible = sum(1 for r in results if r['mp4_accessible'])
-        downloaded = sum(1 for r in results if r.get('downloaded', False))
-        
-        print(f"\n📈 Summary:")
-        print(f"   Total records processed: {len(results)}")
-        print(f"   Hits found: {hits}")
-        print(f"   Accessible MP4s: {accessible}")
-        print(f"   Downloaded: {downloaded}")
-        
     except Exception as e:
-        print(f"❌ Error writing results CSV: {e}")
+        print(f"❌ Error during bulk validation: {e}")
+        if not summary['total']:
+            return None
+    
+    # Summary statistics
+    print(f"\n📈 Summary:")
+    print(f"   Total records processed: {summary['total']}")
+    print(f"   Hits found: {summary['hits']}")
+    print(f"   Accessible MP4s: {summary['accessible']}")
+    print(f"   Downloaded: {summary['downloaded']}")
     
-    return results
+    return summary
 
 def create_sample_csv():
     """Create a sample CSV file for users to understand the format."""
@@ -349,17 +855,22 @@ def main():
         download_choice = input("Download accessible MP4 files? (y/n): ").strip().lower()
         download_videos = download_choice in ['y', 'yes']
         
-        delay = input("Delay between requests in seconds (default: 2): ").strip()
+        rate = input(f"Max requests per second (default: {BULK_RATE_LIMIT}): ").strip()
         try:
-            delay = int(delay) if delay else 2
+            rate = float(rate) if rate else BULK_RATE_LIMIT
         except ValueError:
-            delay = 2
+            rate = BULK_RATE_LIMIT
+        if rate <= 0:
+            rate = BULK_RATE_LIMIT
         
         output_file = input("Output results file (optional, press enter for auto-name): ").strip()
         if not output_file:
             output_file = None
         
-        process_csv_bulk_validation(csv_path, output_file, download_videos, delay)
+        gzip_choice = input("Gzip the results file? (y/n): ").strip().lower()
+        gzip_output = gzip_choice in ['y', 'yes']
+        
+        process_csv_bulk_validation(csv_path, output_file, download_videos, rate, gzip_output)
     
     elif choice == "4":
         create_sample_csv()
@@ -438,4 +949,12 @@ if __name__ == "__main__":
         print("pip install requests")
         exit(1)
     
+    parser = argparse.ArgumentParser(description="University of Iowa Admissions Bulk Validator")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log HTTP requests and responses")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="🔧 [%(levelname)s] %(message)s")
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    
     main()
\ No newline at end of file